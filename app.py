@@ -1,8 +1,15 @@
+import logging
+
 import dash_bootstrap_components as dbc
 from dash_bootstrap_templates import ThemeSwitchAIO
 
 import dash
-from dash import html
+from dash import Input, Output, html
+
+from caching import http
+from caching.memo import memo
+from caching.responses import responses
+from datastore import get_years, store
 
 font_awesome = "https://use.fontawesome.com/releases/v5.10.2/css/all.css"
 meta_tags = [{"name": "viewport", "content": "width=device-width, initial-scale=1.0"}]
@@ -17,9 +24,33 @@ template_theme1 = "flatly"
 url_theme2 = dbc.themes.DARKLY
 template_theme2 = "darkly"
 
+# The cache build reports rejected rows and timings through logging.
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+
 app = dash.Dash(__name__, use_pages=True, external_stylesheets=external_stylesheets)
 
 server = app.server
+memo.init_app(server)
+responses.init_app(server)
+http.init_app(server)
+
+# Page modules register their layouts and callbacks without reading any data;
+# the data store is opened in the background so the server binds right away.
+# It is started by each worker's first request rather than at import, so
+# that under ``gunicorn --preload`` it runs in the workers, not the master.
+@server.before_request
+def start_warm_up():
+    store.warm_up()
+
+
+@server.route("/health")
+def health():
+    if store.ready:
+        return {"status": "ready", "rejections": store.partitions().manifest.get("rejections")}, 200
+    if store.error is not None:
+        return {"status": "failed", "error": str(store.error)}, 503
+    return {"status": "warming"}, 503
+
 
 theme_switch = ThemeSwitchAIO(aio_id="theme", themes=[url_theme1, url_theme2])
 
@@ -67,5 +98,14 @@ app.layout = dbc.Container(
 )
 
 
+# The year dropdown is shared by both pages.
+@app.callback(
+    Output(component_id="year", component_property="options"),
+    Input(component_id="year", component_property="id"),
+)
+def year_options(_):
+    return [{"label": c, "value": c} for c in get_years()]
+
+
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,84 @@
+// Month switching on the sales page runs in the browser: the server sends a
+// year's monthly rollup once (see pages/sales.py) and these functions redraw
+// the header cards, their indicators and the highlighted month from it. Styles
+// and colours come from the "sales_style" store, filled from components/.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    sales: {
+        header: function(month, rollup, style) {
+            const noUpdate = window.dash_clientside.no_update;
+            if (!rollup || !month || !style) {
+                return Array(12).fill(noUpdate);
+            }
+            const cell = function(m) {
+                const values = {};
+                Object.keys(rollup).forEach(function(measure) {
+                    values[measure] = rollup[measure][m] || 0;
+                });
+                return values;
+            };
+            const current = cell(month);
+            const previous = cell(month - 1);
+
+            const number = function(value, precision) {
+                return value.toLocaleString("en-US", {
+                    minimumFractionDigits: precision,
+                    maximumFractionDigits: precision,
+                });
+            };
+            const p = function(children, props) {
+                return {
+                    namespace: "dash_html_components",
+                    type: "P",
+                    props: Object.assign({children: children}, props || {}),
+                };
+            };
+            const indicator = function(reference, precision) {
+                if (reference === null) {
+                    return p("n/a", {className: "card-indicator"});
+                }
+                if (reference > 0) {
+                    return p("+" + number(reference, precision) + "%", {
+                        style: style.indicator.up,
+                        className: "card-indicator",
+                    });
+                }
+                return p(number(reference, 0) + "%", {
+                    style: style.indicator.down,
+                    className: "card-indicator",
+                });
+            };
+
+            const revenue = current.sale_dollars - current.state_bottle_cost;
+            const cost = current.state_bottle_cost;
+            const cards = [
+                p(number(current.bottles_sold, 0)),
+                p(" $" + number(revenue, 0)),
+                p(" $" + number(cost, 0)),
+                p(number(current.vendors, 0)),
+                p(number(current.items, 0)),
+                p(number(current.cities, 0)),
+            ];
+
+            const reference = previous.bottles_sold
+                ? (current.bottles_sold - previous.bottles_sold) / previous.bottles_sold * 100
+                : null;
+            const indicators = style.indicator.precision.map(function(precision) {
+                return indicator(reference, precision);
+            });
+            return cards.concat(indicators);
+        },
+
+        highlight: function(month, figure, style) {
+            if (!figure || !style) {
+                return window.dash_clientside.no_update;
+            }
+            const bars = Object.assign({}, figure.data[0]);
+            bars.marker = Object.assign({}, bars.marker, {
+                color: bars.x.map(function(m) {
+                    return m === month ? style.highlight : style.muted;
+                }),
+            });
+            return Object.assign({}, figure, {data: [bars].concat(figure.data.slice(1))});
+        },
+    },
+});
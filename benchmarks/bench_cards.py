@@ -0,0 +1,151 @@
+"""Requests and server CPU for the sales header cards while browsing a year.
+
+Compares the former layout of twelve single-output callbacks (each masking the
+frame for its own card), which answers every month change, with the
+``update_year_rollup`` callback of the sales page, which sends the year's
+monthly cube cells once; the browser then redraws the cards for each month
+without a request. An interaction steps through the months of one year. Both
+variants run in a throwaway Dash app against the same synthetic frame and are
+driven through the Flask test client, so request handling and JSON encoding
+are included.
+
+    python -m benchmarks.bench_cards [--rows N] [--interactions N]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+import dash
+import numpy as np
+import pandas as pd
+from dash import Input, Output, dcc, html
+
+from components.cards import indicator
+from datastore.cube import MeasureCube, pct_change
+from datastore.rollups import MonthlyCube
+from datastore.schema import MONEY_COLUMNS, to_dollars
+
+CARDS = [f"card{i}" for i in range(1, 7)]
+HEADER_MEASURES = ["bottles_sold", "sale_dollars", "state_bottle_cost", "vendors", "items", "cities"]
+MONTHS = range(2, 13)
+INDICATORS = [f"indicator{i}" for i in range(1, 7)]
+
+
+def sample(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "yyyy": np.full(rows, 2021, dtype=np.int16),
+            "mm": rng.integers(1, 13, rows).astype(np.int8),
+            "bottles_sold": rng.integers(1, 48, rows).astype(np.int32),
+            "sale_dollars": rng.integers(500, 50_000, rows).astype(np.int32),
+            "state_bottle_cost": rng.integers(300, 30_000, rows).astype(np.int32),
+            "vendor_number": pd.Categorical(rng.integers(0, 300, rows)),
+            "item_description": pd.Categorical(rng.integers(0, 5_000, rows)),
+            "city": pd.Categorical(rng.integers(0, 400, rows)),
+        }
+    )
+
+
+def legacy_output(df: pd.DataFrame, output: str, year: int, month: int):
+    data3 = df[(df["yyyy"] == year) & (df["mm"] == month)]
+    if output in INDICATORS:
+        data2 = df[(df["yyyy"] == year) & (df["mm"] == month - 1)]
+        reference = pct_change(data3["bottles_sold"].sum(), data2["bottles_sold"].sum())
+        return indicator(reference, precision=0 if output == "indicator1" else 2)
+    if output == "card1":
+        return html.P(f"{data3['bottles_sold'].sum():,.0f}")
+    if output == "card2":
+        revenue = to_dollars(data3["sale_dollars"].sum() - data3["state_bottle_cost"].sum())
+        return html.P(f" ${revenue:,.0f}")
+    if output == "card3":
+        return html.P(f" ${to_dollars(data3['state_bottle_cost'].sum()):,.0f}")
+    column = {"card4": "vendor_number", "card5": "item_description", "card6": "city"}[output]
+    return html.P(f"{len(data3[column].unique().tolist()):,.0f}")
+
+
+def build_app(df: pd.DataFrame, consolidated: bool) -> dash.Dash:
+    app = dash.Dash(__name__)
+    app.layout = html.Div(
+        [html.Div(id="year"), html.Div(id="month"), dcc.Store(id="year_rollup")]
+        + [html.P(id=i) for i in CARDS + INDICATORS]
+    )
+
+    if consolidated:
+        rollup = MonthlyCube()
+        rollup.add(df)
+        cube = MeasureCube(rollup.result(), MonthlyCube.keys)
+
+        @app.callback(Output("year_rollup", "data"), Input("year", "children"))
+        def update_year_rollup(year):
+            cells = [cube.get(year, mm) for mm in range(13)]
+            rollup = {measure: [int(cell[measure]) for cell in cells] for measure in HEADER_MEASURES}
+            for measure in rollup.keys() & set(MONEY_COLUMNS):
+                rollup[measure] = [to_dollars(value) for value in rollup[measure]]
+            return rollup
+
+    else:
+        for output in CARDS + INDICATORS:
+
+            @app.callback(Output(output, "children"), Input("year", "children"), Input("month", "children"))
+            def update_card(year, month, output=output):
+                return legacy_output(df, output, year, month)
+
+    return app
+
+
+def payloads(consolidated: bool) -> list[dict]:
+    """The callback requests sent while stepping through the months of a year."""
+    year = {"id": "year", "property": "children", "value": 2021}
+    if consolidated:
+        target = {"id": "year_rollup", "property": "data"}
+        base = {"inputs": [year], "changedPropIds": ["year.children"], "state": []}
+        return [{**base, "output": "year_rollup.data", "outputs": target}]
+    requests = []
+    for month in MONTHS:
+        inputs = [year, {"id": "month", "property": "children", "value": month}]
+        base = {"inputs": inputs, "changedPropIds": ["month.children"], "state": []}
+        for output in CARDS + INDICATORS:
+            target = {"id": output, "property": "children"}
+            requests.append({**base, "output": f"{output}.children", "outputs": target})
+    return requests
+
+
+def run(df: pd.DataFrame, consolidated: bool, interactions: int) -> dict:
+    client = build_app(df, consolidated).server.test_client()
+    requests = sent = 0
+    wall, cpu = time.perf_counter(), time.process_time()
+    for _ in range(interactions):
+        for payload in payloads(consolidated):
+            response = client.post("/_dash-update-component", data=json.dumps(payload), content_type="application/json")
+            assert response.status_code == 200, response.data
+            requests += 1
+            sent += len(response.data)
+    return {
+        "requests": requests / interactions,
+        "bytes": sent / interactions,
+        "wall_ms": (time.perf_counter() - wall) * 1000 / interactions,
+        "cpu_ms": (time.process_time() - cpu) * 1000 / interactions,
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--interactions", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    df = sample(args.rows)
+    print(f"per year of month changes ({args.rows:,} rows, {args.interactions} interactions)")
+    for name, consolidated in [("12 callbacks", False), ("year rollup", True)]:
+        result = run(df, consolidated, args.interactions)
+        print(
+            f"{name:<14} {result['requests']:4.0f} requests  {result['bytes']:8,.0f} bytes"
+            f"  {result['wall_ms']:8.2f} ms wall  {result['cpu_ms']:8.2f} ms cpu"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Per-call figure construction and encoding: ``make_subplots`` versus the figure factory.
+
+Builds the sales chart (12 months, two traces on two axes) and the annual
+products chart (220 labelled bars) both ways and encodes each with plotly's
+JSON encoder, as Dash does before answering a callback. As on the sales
+page, the factory sales chart leaves the month highlight to the browser.
+
+    python -m benchmarks.bench_figures [--repeat N]
+"""
+from __future__ import annotations
+
+import argparse
+import timeit
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.io.json import to_json_plotly
+from plotly.subplots import make_subplots
+
+from components import figures
+
+
+def monthly(seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "mm": np.arange(1, 13),
+            "bottles_sold": rng.integers(100_000, 900_000, 12),
+            "sale_dollars": rng.uniform(1e6, 9e6, 12),
+        }
+    )
+
+
+def products(seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "mm": rng.integers(1, 13, 220),
+            "bottles_sold": np.sort(rng.integers(1_000, 90_000, 220)),
+            "item_description": [f"Product {i}" for i in range(220)],
+        }
+    )
+
+
+def legacy_sold_chart(data2: pd.DataFrame, month: int):
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig.add_trace(
+        go.Bar(
+            x=data2["mm"],
+            y=data2["bottles_sold"],
+            name="Total Bottles Sold",
+            text=data2["bottles_sold"],
+            textposition="outside",
+            texttemplate="%{text:.2s}",
+        ),
+        secondary_y=False,
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=data2["mm"],
+            y=data2["sale_dollars"],
+            name="Total Sales in $",
+            marker=dict(size=12, line=dict(width=2, color="rgb(102, 255, 204)")),
+            line=dict(width=2, color="rgb(102, 255, 204)"),
+            text=data2["sale_dollars"],
+            textposition="top right",
+            textfont=dict(color="rgb(102, 255, 204)"),
+            mode="lines+markers+text",
+            texttemplate="%{text:.2s}",
+        ),
+        secondary_y=True,
+    )
+    fig.update_traces(marker_color="rgb(33, 60, 99)")
+    fig.update_layout(
+        height=315,
+        margin=dict(l=20, r=30, t=30, b=30),
+        plot_bgcolor="rgb(0,0,0,0)",
+        legend_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgb(0,0,0,0)",
+        font_color="#909090",
+        hovermode="closest",
+        xaxis_title="Months",
+        yaxis_title="Total of Bottles Sold",
+        legend=dict(yanchor="top", y=1.4, xanchor="left", x=0),
+        title={"text": "Bottles Sold vs Revenue", "y": 0.9, "x": 0.5, "xanchor": "center", "yanchor": "top"},
+    )
+    fig["data"][0]["marker"]["color"] = ["#E74C3C" if c == month else "#2C3E50" for c in fig["data"][0]["x"]]
+    return fig
+
+
+def factory_sold_chart(data2: pd.DataFrame):
+    months = data2["mm"].tolist()
+    return figures.figure(
+        figures.SOLD_CHART,
+        {
+            "type": "bar",
+            "x": months,
+            "y": data2["bottles_sold"].tolist(),
+            "name": "Total Bottles Sold",
+            "text": data2["bottles_sold"].tolist(),
+            "textposition": "outside",
+            "texttemplate": "%{text:.2s}",
+            "marker": {"color": figures.MUTED},
+            "xaxis": "x",
+            "yaxis": "y",
+        },
+        {
+            "type": "scatter",
+            "x": months,
+            "y": data2["sale_dollars"].tolist(),
+            "name": "Total Sales in $",
+            "marker": {"size": 12, "line": {"width": 2, "color": "rgb(102, 255, 204)"}, "color": figures.BAR_COLOR},
+            "line": {"width": 2, "color": "rgb(102, 255, 204)"},
+            "text": data2["sale_dollars"].tolist(),
+            "textposition": "top right",
+            "textfont": {"color": "rgb(102, 255, 204)"},
+            "mode": "lines+markers+text",
+            "texttemplate": "%{text:.2s}",
+            "xaxis": "x",
+            "yaxis": "y2",
+        },
+    )
+
+
+def legacy_anual_products(data2: pd.DataFrame):
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig.add_trace(
+        go.Bar(
+            x=data2["mm"],
+            y=data2["bottles_sold"],
+            name="Total Bottles Sold",
+            text=data2["item_description"],
+            textposition="outside",
+            texttemplate="%{text:.0s}",
+        ),
+        secondary_y=False,
+    )
+    fig.update_traces(marker_color=data2["bottles_sold"])
+    fig.update_layout(
+        height=315,
+        margin=dict(l=20, r=30, t=50, b=30),
+        plot_bgcolor="rgb(0,0,0,0)",
+        legend_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgb(0,0,0,0)",
+        font_color="#909090",
+        hovermode="closest",
+        xaxis_title="Months",
+        yaxis_title="Bottles Sold",
+        legend=dict(yanchor="top", y=1.4, xanchor="left", x=0),
+        title={"text": "Annual Bottles Sold", "y": 0.98, "x": 0.5, "xanchor": "center", "yanchor": "top"},
+    )
+    return fig
+
+
+def factory_anual_products(data2: pd.DataFrame):
+    return figures.figure(
+        figures.ANUAL_PRODUCTS,
+        {
+            "type": "bar",
+            "x": data2["mm"].tolist(),
+            "y": data2["bottles_sold"].tolist(),
+            "name": "Total Bottles Sold",
+            "text": data2["item_description"].tolist(),
+            "textposition": "outside",
+            "texttemplate": "%{text:.0s}",
+            "marker": {"color": data2["bottles_sold"].tolist()},
+        },
+    )
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    months, top = monthly(), products()
+    cases = {
+        "sold_chart": (lambda: legacy_sold_chart(months, 3), lambda: factory_sold_chart(months)),
+        "anual_products": (lambda: legacy_anual_products(top), lambda: factory_anual_products(top)),
+    }
+    for name, (legacy, factory) in cases.items():
+        timings = {}
+        for label, build in (("make_subplots", legacy), ("factory", factory)):
+            seconds = timeit.timeit(lambda: to_json_plotly(build()), number=args.repeat) / args.repeat
+            timings[label] = seconds
+            print(f"{name:<15} {label:<14} {seconds * 1e3:8.2f} ms/call")
+        print(f"{name:<15} {'speedup':<14} {timings['make_subplots'] / timings['factory']:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Measure time-to-first-bind and time-to-ready of the dashboard server.
+
+Starts ``app.server`` in a fresh interpreter and polls ``/health``. The server
+is bound as soon as ``/health`` answers at all (503 while warming up) and ready
+once it answers 200. Exits non-zero when binding takes longer than
+``BIND_TARGET_S``, so it can gate a deploy.
+
+    python -m benchmarks.bench_startup [--port N] [--timeout S]
+"""
+from __future__ import annotations
+
+import argparse
+import pathlib
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+# Health checks during rolling deploys give a new worker this long to bind.
+BIND_TARGET_S = 5.0
+
+ROOT = pathlib.Path(__file__).parent.parent
+
+SERVE = "from app import server; server.run(host='127.0.0.1', port={port})"
+
+
+def poll(url: str) -> int | None:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status
+    except urllib.error.HTTPError as exc:
+        return exc.code
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        return None
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    args = parser.parse_args(argv)
+
+    url = f"http://127.0.0.1:{args.port}/health"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", SERVE.format(port=args.port)],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    bound = ready = None
+    try:
+        while time.perf_counter() - start < args.timeout and process.poll() is None:
+            status = poll(url)
+            elapsed = time.perf_counter() - start
+            if status is not None and bound is None:
+                bound = elapsed
+            if status == 200:
+                ready = elapsed
+                break
+            time.sleep(0.05)
+    finally:
+        process.terminate()
+        process.wait()
+
+    if bound is None:
+        sys.exit("server never answered /health")
+    print(f"time to first bind: {bound:6.2f} s  (target {BIND_TARGET_S:.1f} s)")
+    print(f"time to ready:      {ready:6.2f} s" if ready is not None else "time to ready:      not ready before timeout")
+    if bound > BIND_TARGET_S:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
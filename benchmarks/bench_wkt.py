@@ -0,0 +1,57 @@
+"""Compare the legacy ``str.split`` chain with ``datastore.wkt.parse_points``.
+
+    python -m benchmarks.bench_wkt [--rows N] [--stores N]
+"""
+from __future__ import annotations
+
+import argparse
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from datastore.wkt import parse_points
+
+
+def legacy_chain(locations: pd.Series) -> tuple[pd.Series, pd.Series]:
+    df = pd.DataFrame({"store_location": locations})
+    df["lon"] = df["store_location"].str.split(' ').str[1]
+    df["lon"] = df["lon"].str.split('(').str[1]
+    df["lon"].fillna(0, inplace=True)
+    df["lat"] = df["store_location"].str.split(' ').str[2]
+    df["lat"] = df["lat"].str.split(')').str[0]
+    df["lat"].fillna(0, inplace=True)
+    df["lat"] = df["lat"].astype(float)
+    df["lon"] = df["lon"].astype(float)
+    return df["lon"], df["lat"]
+
+
+def sample(rows: int, stores: int, seed: int = 0) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    lon = rng.uniform(-96.6, -90.1, stores).round(6)
+    lat = rng.uniform(40.4, 43.5, stores).round(6)
+    points = np.array([f"POINT ({x} {y})" for x, y in zip(lon, lat)], dtype=object)
+    return pd.Series(points[rng.integers(0, stores, rows)])
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--stores", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    locations = sample(args.rows, args.stores)
+
+    lon_old, lat_old = legacy_chain(locations)
+    lon_new, lat_new = parse_points(locations)
+    assert np.allclose(lon_old.to_numpy(), lon_new)
+    assert np.allclose(lat_old.to_numpy(), lat_new)
+
+    for name, fn in [("str.split chain", legacy_chain), ("parse_points", parse_points)]:
+        best = min(timeit.repeat(lambda: fn(locations), number=1, repeat=args.repeat))
+        print(f"{name:<16} {best * 1000:9.1f} ms  ({args.rows:,} rows, {args.stores:,} stores)")
+
+
+if __name__ == "__main__":
+    main()
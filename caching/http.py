@@ -0,0 +1,148 @@
+"""Compression and conditional responses on the Flask server.
+
+* Callback, layout and other text responses are compressed with Brotli or
+  gzip by Flask-Compress, whichever the browser accepts.
+* Text assets are precompressed next to the originals (``style.css.br``,
+  ``style.css.gz``) by the deploy step below. A copy that is at least as
+  recent as its original is served as it is when the browser accepts the
+  encoding; otherwise the asset goes through Flask-Compress like any other
+  response. Workers never write the copies themselves.
+* Successful GET responses (the index, layout and assets) carry an ETag; a
+  request whose ``If-None-Match`` matches is answered with an empty 304.
+  Callback responses get no ETag: the Dash renderer never revalidates them
+  and would treat a 304 as a failed callback.
+
+    python -m caching.http   # precompress the assets ahead of a deploy
+"""
+from __future__ import annotations
+
+import gzip
+import mimetypes
+import os
+import pathlib
+
+import brotli
+import flask
+from flask_compress import Compress
+
+from datastore.paths import PATH
+
+ASSETS_PATH = PATH / "assets"
+ASSETS_URL = "/assets/"
+PRECOMPRESSED = {".css", ".js", ".svg", ".json", ".map"}
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+COMPRESS_CONFIG = {
+    "COMPRESS_ALGORITHM": ["br", "gzip"],
+    "COMPRESS_MIMETYPES": [
+        "application/json",
+        "application/javascript",
+        "text/css",
+        "text/html",
+        "text/javascript",
+    ],
+    # Callbacks are answered while the user waits; trade ratio for speed.
+    "COMPRESS_BR_LEVEL": 4,
+    "COMPRESS_LEVEL": 6,
+    "COMPRESS_MIN_SIZE": 500,
+}
+
+compress = Compress()
+
+
+def _is_fresh(compressed: pathlib.Path, path: pathlib.Path) -> bool:
+    try:
+        return compressed.stat().st_mtime >= path.stat().st_mtime
+    except FileNotFoundError:
+        return False
+
+
+def _write_atomic(target: pathlib.Path, data: bytes) -> None:
+    # A running server may be sending the previous copy; it must never see a
+    # half-written one.
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, target)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def precompress(directory: pathlib.Path = ASSETS_PATH) -> list[pathlib.Path]:
+    """Write ``.br`` and ``.gz`` copies of the text assets that are missing or stale."""
+    written = []
+    for path in sorted(directory.rglob("*")):
+        if path.suffix not in PRECOMPRESSED or not path.is_file():
+            continue
+        data = None
+        for encoding, suffix in ENCODINGS.items():
+            target = path.with_name(path.name + suffix)
+            if _is_fresh(target, path):
+                continue
+            data = path.read_bytes() if data is None else data
+            if encoding == "br":
+                _write_atomic(target, brotli.compress(data, quality=11))
+            else:
+                _write_atomic(target, gzip.compress(data, compresslevel=9, mtime=0))
+            written.append(target)
+    return written
+
+
+def serve_precompressed():
+    request = flask.request
+    if request.method not in ("GET", "HEAD") or not request.path.startswith(ASSETS_URL):
+        return None
+    path = (ASSETS_PATH / request.path[len(ASSETS_URL):]).resolve()
+    if ASSETS_PATH.resolve() not in path.parents or path.suffix not in PRECOMPRESSED:
+        return None
+    for encoding, suffix in ENCODINGS.items():
+        if encoding not in request.accept_encodings:
+            continue
+        compressed = path.with_name(path.name + suffix)
+        if _is_fresh(compressed, path):
+            response = flask.send_file(
+                compressed,
+                mimetype=mimetypes.guess_type(path.name)[0],
+                conditional=True,
+                etag=True,
+            )
+            response.headers["Content-Encoding"] = encoding
+            response.vary.add("Accept-Encoding")
+            return response
+    return None
+
+
+def _matches(response: flask.Response, tags) -> bool:
+    etag, _ = response.get_etag()
+    # Flask-Compress suffixes the tag of a compressed body with its encoding
+    # ("<etag>:br"), which is what the browser sends back.
+    return any(tag == etag or tag.startswith(f"{etag}:") for tag in tags)
+
+
+def conditional(response: flask.Response) -> flask.Response:
+    request = flask.request
+    if request.method not in ("GET", "HEAD") or response.status_code != 200:
+        return response
+    # Precompressed and other static files are made conditional by send_file.
+    if response.direct_passthrough or "Content-Encoding" in response.headers:
+        return response
+    response.add_etag()
+    if _matches(response, request.if_none_match.as_set()):
+        response.status_code = 304
+        response.set_data(b"")
+    return response
+
+
+def init_app(server: flask.Flask) -> None:
+    server.config.update(COMPRESS_CONFIG)
+    compress.init_app(server)
+    # after_request handlers run last-registered first: ETags are taken on
+    # the plain body, before Flask-Compress encodes it.
+    server.after_request(conditional)
+    server.before_request(serve_precompressed)
+
+
+if __name__ == "__main__":
+    for written in precompress():
+        print(written.relative_to(PATH))
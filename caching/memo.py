@@ -0,0 +1,198 @@
+"""Memoization of the page callbacks on the Flask server.
+
+``memo.memoize`` wraps a callback so a repeat of the same inputs is answered
+from a Flask-Caching backend. Keys are built from the callback, the build, the
+dataset version and the normalized inputs: multi-select values are sorted, so
+picking the same counties in a different order is still a hit, and entries
+built from older code or an older dataset can never be served. Reloading the
+data store also clears the backend.
+
+The backend is chosen with environment variables:
+
+* ``IOWA_CALLBACK_CACHE``: ``memory`` (default), ``filesystem`` or ``off``.
+* ``IOWA_CALLBACK_CACHE_SIZE``: entries kept before the oldest are evicted.
+* ``IOWA_CALLBACK_CACHE_TTL``: seconds an entry lives.
+* ``IOWA_BUILD_ID``: identifies the deployed code; defaults to a hash of the
+  application sources.
+
+The memory backend evicts the least recently used entry; the filesystem one,
+shared by every worker on the host, evicts expired and then the oldest files.
+Hits and misses are counted per callback and served at ``/cache/stats``.
+"""
+from __future__ import annotations
+
+import collections
+import functools
+import hashlib
+import os
+import threading
+import time
+
+from flask import Flask
+from flask_caching import Cache
+from flask_caching.backends.base import BaseCache
+
+from datastore import store
+from datastore.paths import CACHE_PATH, PATH
+
+BACKEND = os.environ.get("IOWA_CALLBACK_CACHE", "memory")
+SIZE = int(os.environ.get("IOWA_CALLBACK_CACHE_SIZE", 512))
+TTL = int(os.environ.get("IOWA_CALLBACK_CACHE_TTL", 3600))
+CALLBACK_CACHE_PATH = CACHE_PATH / "callbacks"
+SOURCES = ["app.py", "caching", "components", "datastore", "pages"]
+
+
+def source_fingerprint(root=PATH) -> str:
+    """A hash of the application's Python sources.
+
+    The filesystem backend outlives a deploy; keying on the code keeps a
+    callback whose body or helpers changed from replaying the old output.
+    """
+    digest = hashlib.sha1()
+    for name in SOURCES:
+        path = root / name
+        for source in sorted(path.rglob("*.py")) if path.is_dir() else [path]:
+            digest.update(str(source.relative_to(root)).encode())
+            digest.update(source.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+BUILD_ID = os.environ.get("IOWA_BUILD_ID") or source_fingerprint()
+
+
+class LRUCache(BaseCache):
+    """In-memory backend keeping at most ``threshold`` entries, least recently used out first.
+
+    Values are kept as they are rather than pickled: callback results are
+    only read by Dash when it serializes the response.
+    """
+
+    def __init__(self, threshold: int = 500, default_timeout: int = 300):
+        super().__init__(default_timeout)
+        self.threshold = threshold
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        kwargs.update(threshold=config["CACHE_THRESHOLD"])
+        return cls(*args, **kwargs)
+
+    def _expiry(self, timeout) -> float | None:
+        timeout = self._normalize_timeout(timeout)
+        return time.monotonic() + timeout if timeout > 0 else None
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None) -> bool:
+        with self._lock:
+            self._entries[key] = (self._expiry(timeout), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.threshold:
+                self._entries.popitem(last=False)
+        return True
+
+    def add(self, key, value, timeout=None) -> bool:
+        if self.has(key):
+            return False
+        return self.set(key, value, timeout)
+
+    def delete(self, key) -> bool:
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def has(self, key) -> bool:
+        return self.get(key) is not None
+
+    def clear(self) -> bool:
+        with self._lock:
+            self._entries.clear()
+        return True
+
+
+BACKENDS = {
+    "memory": {"CACHE_TYPE": "caching.memo.LRUCache"},
+    "filesystem": {"CACHE_TYPE": "FileSystemCache", "CACHE_DIR": str(CALLBACK_CACHE_PATH)},
+    "off": {"CACHE_TYPE": "NullCache"},
+}
+
+
+def normalize(value):
+    """A hashable, order-insensitive form of a callback input."""
+    if isinstance(value, (list, tuple, set)):
+        return tuple(sorted((normalize(v) for v in value), key=repr))
+    if isinstance(value, dict):
+        return tuple(sorted((k, normalize(v)) for k, v in value.items()))
+    return value
+
+
+class CallbackCache:
+    def __init__(self):
+        self.cache = Cache()
+        self.server = None
+        self.enabled = False
+        self._stats = collections.defaultdict(collections.Counter)
+        self._lock = threading.Lock()
+
+    def init_app(self, server: Flask, backend: str = BACKEND, size: int = SIZE, ttl: int = TTL) -> None:
+        config = {**BACKENDS[backend], "CACHE_THRESHOLD": size, "CACHE_DEFAULT_TIMEOUT": ttl}
+        self.cache.init_app(server, config=config)
+        self.server = server
+        self.enabled = backend != "off"
+        store.on_reload(lambda _: self.clear())
+        server.add_url_rule("/cache/stats", "cache_stats", self.stats)
+
+    def key(self, name: str, args: tuple) -> str:
+        inputs = hashlib.sha1(repr(normalize(args)).encode()).hexdigest()
+        return f"{name}:{BUILD_ID}:{store.version}:{inputs}"
+
+    def memoize(self, func):
+        # Pages reuse function names, so the line number keeps keys apart.
+        name = f"{func.__module__}.{func.__name__}:{func.__code__.co_firstlineno}"
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            if not self.enabled:
+                return func(*args)
+            key = self.key(name, args)
+            value = self.cache.get(key)
+            if value is not None:
+                self.count(name, "hits")
+                return value
+            self.count(name, "misses")
+            value = func(*args)
+            self.cache.set(key, value)
+            return value
+
+        return wrapper
+
+    def count(self, name: str, outcome: str) -> None:
+        with self._lock:
+            self._stats[name][outcome] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            callbacks = {name: dict(counts) for name, counts in self._stats.items()}
+        return {
+            "hits": sum(c.get("hits", 0) for c in callbacks.values()),
+            "misses": sum(c.get("misses", 0) for c in callbacks.values()),
+            "callbacks": callbacks,
+        }
+
+    def clear(self) -> None:
+        # Reloads happen outside of any request.
+        with self.server.app_context():
+            self.cache.clear()
+
+
+memo = CallbackCache()
@@ -0,0 +1,83 @@
+"""Cache of the encoded responses of the chart callbacks.
+
+Building a plotly figure and encoding it to JSON usually costs more than the
+aggregation behind it. ``ResponseCache`` wraps Dash's ``_dash-update-component``
+view and keeps the response bytes of the registered chart outputs, keyed by
+the output, the normalized inputs and state, the build, the dataset version
+and the theme. A hit returns the stored bytes as they are, so neither the
+figure nor its JSON is built again.
+
+Entries share the backend of the callback cache, including its size limit,
+TTL and invalidation on reload.
+"""
+from __future__ import annotations
+
+import hashlib
+
+import flask
+
+from caching.memo import BUILD_ID, CallbackCache, memo, normalize
+from datastore import store
+
+UPDATE_ENDPOINT = "/_dash-update-component"
+THEME_COMPONENT = "ThemeSwitchAIO"
+
+
+def _values(items) -> list:
+    # Pattern-matching inputs arrive as nested lists of {id, property, value}.
+    values = []
+    for item in items or []:
+        if isinstance(item, list):
+            values.append(_values(item))
+        else:
+            values.append((repr(item["id"]), item["property"], normalize(item.get("value"))))
+    return values
+
+
+def theme(body: dict) -> str | None:
+    """The theme switch value among the callback's inputs and state, if any."""
+    for item in [*body.get("inputs", []), *body.get("state", [])]:
+        if isinstance(item, dict) and isinstance(item["id"], dict):
+            if item["id"].get("component") == THEME_COMPONENT:
+                return repr(item.get("value"))
+    return None
+
+
+class ResponseCache:
+    def __init__(self, callbacks: CallbackCache):
+        self.callbacks = callbacks
+        self.outputs = set()
+
+    def register(self, output: str) -> None:
+        """Cache the responses of the callback writing ``output`` (``"<id>.<property>"``)."""
+        self.outputs.add(output)
+
+    def key(self, body: dict) -> str:
+        inputs = repr((_values(body.get("inputs")), _values(body.get("state"))))
+        digest = hashlib.sha1(inputs.encode()).hexdigest()
+        return f"response:{body['output']}:{BUILD_ID}:{store.version}:{theme(body)}:{digest}"
+
+    def init_app(self, server: flask.Flask) -> None:
+        view = server.view_functions[UPDATE_ENDPOINT]
+
+        def dispatch():
+            body = flask.request.get_json()
+            output = body.get("output")
+            if not self.callbacks.enabled or output not in self.outputs:
+                return view()
+            name = f"response:{output}"
+            key = self.key(body)
+            data = self.callbacks.cache.get(key)
+            if data is not None:
+                self.callbacks.count(name, "hits")
+                return flask.Response(data, mimetype="application/json")
+            self.callbacks.count(name, "misses")
+            response = view()
+            if response.status_code == 200:
+                self.callbacks.cache.set(key, response.get_data())
+            return response
+
+        server.view_functions[UPDATE_ENDPOINT] = dispatch
+
+
+responses = ResponseCache(memo)
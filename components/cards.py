@@ -0,0 +1,68 @@
+"""Rendering of the header cards shared by the dashboard pages."""
+from __future__ import annotations
+
+import math
+
+from dash import html
+
+from datastore.cube import pct_change
+from datastore.schema import to_dollars
+
+INDICATOR_UP = {"color": "rgb(102, 255, 204)", "font-weight": "bold"}
+INDICATOR_DOWN = {"color": "#EC1E3D", "font-weight": "bold"}
+
+# How the sales page draws ``indicator1``-``indicator6`` in the browser (see
+# assets/clientside.js): the styles above and each indicator's precision.
+SALES_INDICATORS = {"up": INDICATOR_UP, "down": INDICATOR_DOWN, "precision": [0, 2, 2, 2, 2, 2]}
+
+
+def indicator(reference: float, precision: int = 2) -> html.P:
+    """Percentage change badge shown under a card value."""
+    if math.isnan(reference):
+        # Nothing to compare with, e.g. the first month or year on record.
+        return html.P("n/a", className="card-indicator")
+
+    if reference > 0:
+        return html.P(
+            f"+{reference:,.{precision}f}%",
+            style=INDICATOR_UP,
+            className="card-indicator",
+        )
+
+    return html.P(
+        f"{reference:,.0f}%",
+        style=INDICATOR_DOWN,
+        className="card-indicator",
+    )
+
+
+def finance_header(current: dict, previous: dict) -> list:
+    """Children of ``card9``-``card14`` followed by ``indicator9``-``indicator14``.
+
+    ``current`` and ``previous`` are yearly KPI cells; a prior year with no
+    sales yields "n/a" indicators instead of a division by zero.
+    """
+    revenue = to_dollars(current["sale_dollars"] - current["state_bottle_cost"])
+    cost = to_dollars(current["state_bottle_cost"])
+    cards = [
+        html.P(f" ${revenue:,.0f}"),
+        html.P(f" ${cost:,.0f}"),
+        html.P(f"{current['bottles_sold']:,.0f}"),
+        html.P(f"{current['vendors']:,.0f}"),
+        html.P(f"{current['rows']:,.0f}"),
+        html.P(f"{current['items']:,.0f}"),
+    ]
+
+    def change(measure):
+        return pct_change(current[measure], previous[measure])
+
+    indicators = [
+        indicator(change("sale_dollars")),
+        indicator(change("bottles_sold")),
+        indicator(change("bottles_sold"), precision=0),
+        indicator(change("bottles_sold")),
+        indicator(change("rows")),
+        indicator(change("items")),
+    ]
+
+    return cards + indicators
@@ -0,0 +1,120 @@
+"""Figure skeletons for the dashboard charts.
+
+Every chart shares the same transparent, fixed-height frame and differs only
+in its titles and axes. Each chart's layout is built once here as a plain
+dict; callbacks pass their data arrays to ``figure`` and get back a figure
+dict that Dash serializes directly. Nothing goes through ``go.Figure``, so
+plotly's property validation stays off the callback path.
+"""
+from __future__ import annotations
+
+import functools
+
+import plotly.io as pio
+from plotly.colors import sequential
+
+BAR_COLOR = "rgb(33, 60, 99)"
+HIGHLIGHT = "#E74C3C"
+MUTED = "#2C3E50"
+
+BASE_LAYOUT = {
+    "height": 315,
+    "margin": {"l": 20, "r": 30, "t": 50, "b": 30},
+    "plot_bgcolor": "rgb(0,0,0,0)",
+    "paper_bgcolor": "rgb(0,0,0,0)",
+    "font": {"color": "#909090"},
+    "hovermode": "closest",
+    "legend": {"bgcolor": "rgba(0,0,0,0)"},
+}
+
+# The axes ``make_subplots(specs=[[{"secondary_y": True}]])`` lays out.
+SECONDARY_Y_AXES = {
+    "xaxis": {"anchor": "y", "domain": [0.0, 0.94]},
+    "yaxis": {"anchor": "x", "domain": [0.0, 1.0]},
+    "yaxis2": {"anchor": "x", "overlaying": "y", "side": "right"},
+}
+
+TOP_LEGEND = {"yanchor": "top", "y": 1.4, "xanchor": "left", "x": 0, "bgcolor": "rgba(0,0,0,0)"}
+
+
+def _merge(base: dict, patch: dict) -> dict:
+    merged = dict(base)
+    for key, value in patch.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            value = _merge(merged[key], value)
+        merged[key] = value
+    return merged
+
+
+def skeleton(secondary_y: bool = False, **layout) -> dict:
+    """A chart layout on top of the shared frame."""
+    base = _merge(BASE_LAYOUT, SECONDARY_Y_AXES) if secondary_y else BASE_LAYOUT
+    return _merge(base, layout)
+
+
+def title(text: str, y: float) -> dict:
+    return {"text": text, "y": y, "x": 0.5, "xanchor": "center", "yanchor": "top"}
+
+
+@functools.lru_cache(maxsize=None)
+def _template(name: str) -> dict:
+    return pio.templates[name].to_plotly_json()
+
+
+def figure(layout: dict, *traces: dict, **patch) -> dict:
+    """A figure dict from a prebuilt layout and its traces.
+
+    ``patch`` overrides layout keys that depend on the data, such as an axis
+    range. The current default plotly template is applied as ``go.Figure``
+    would.
+    """
+    if patch:
+        layout = _merge(layout, patch)
+    return {"data": list(traces), "layout": {**layout, "template": _template(pio.templates.default)}}
+
+
+SOLD_CHART = skeleton(
+    secondary_y=True,
+    margin={"t": 30},
+    xaxis={"title": {"text": "Months"}},
+    yaxis={"title": {"text": "Total of Bottles Sold"}},
+    legend=TOP_LEGEND,
+    title=title("Bottles Sold vs Revenue", 0.9),
+)
+
+TOP_COUNTY = skeleton(title=title("Top 5 Counties", 0.95))
+
+ANUAL_COUNTY = skeleton(
+    xaxis={"title": {"text": "Months"}},
+    yaxis={"title": {"text": "Total of Bottles Sold by County"}},
+    legend=TOP_LEGEND,
+    title=title("Total of Bottles Sold by County", 0.98),
+)
+
+# The pie keeps the plain ``px.pie`` look rather than the shared frame.
+PRODUCT_SEASON = {
+    "margin": {"t": 60},
+    "title": {"text": "% consumption per season"},
+    "legend": {"tracegroupgap": 0},
+    "piecolorway": sequential.RdBu,
+    "uniformtext": {"minsize": 10, "mode": "hide"},
+    "annotations": [{"text": "Seasons", "x": 0.5, "y": 0.5, "font": {"size": 12}, "showarrow": False}],
+}
+
+ANNUAL_FINANCIAL = skeleton(
+    xaxis={
+        "rangeslider": {"visible": True},
+        "tickangle": 0,
+        "title": {"text": "ISO week", "standoff": 2},
+    },
+    yaxis={"title": {"text": "Bottles Sold", "standoff": 25}},
+    legend=TOP_LEGEND,
+    title=title("Annual Revenue", 0.9),
+)
+
+ANUAL_PRODUCTS = skeleton(
+    xaxis={"title": {"text": "Months"}},
+    yaxis={"title": {"text": "Bottles Sold"}},
+    legend=TOP_LEGEND,
+    title=title("Annual Bottles Sold", 0.98),
+)
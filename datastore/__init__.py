@@ -0,0 +1,43 @@
+from datastore.calendar import season_dict
+from datastore.cube import MeasureCube, pct_change
+from datastore.ingest import RejectionReport, iter_sales
+from datastore.paths import CACHE_PATH, DATA_PATH, SOURCE_FILE
+from datastore.partitions import PartitionedStore
+from datastore.store import (
+    DataStore,
+    get_cube,
+    get_dimension,
+    get_month_grid,
+    get_month_measures,
+    get_rollup,
+    get_top,
+    get_year_measures,
+    get_years,
+    get_ytd,
+    store,
+)
+from datastore.ytd import YearToDate
+
+__all__ = [
+    "CACHE_PATH",
+    "DATA_PATH",
+    "SOURCE_FILE",
+    "DataStore",
+    "MeasureCube",
+    "PartitionedStore",
+    "RejectionReport",
+    "YearToDate",
+    "get_cube",
+    "get_dimension",
+    "get_month_grid",
+    "get_month_measures",
+    "get_rollup",
+    "get_top",
+    "get_year_measures",
+    "get_years",
+    "get_ytd",
+    "iter_sales",
+    "pct_change",
+    "season_dict",
+    "store",
+]
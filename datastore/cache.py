@@ -0,0 +1,236 @@
+"""On-disk cache of the cleaned and derived sales frame.
+
+The first load of a source CSV streams it in chunks. Each derived chunk is
+appended to the year/month partitions under ``pages/data/cache/<name>/`` (see
+``datastore.partitions``) and folded into the rollups of ``datastore.rollups``
+(stored as ``<name>.<rollup>.parquet``). Only one chunk is held in memory at a
+time, so multi-year exports can be cached on a modest box.
+
+A JSON sidecar holds the partition manifest and fingerprints the source.
+Later loads reuse the cache as long as the fingerprint still matches: an
+unchanged mtime is trusted as is, a changed mtime falls back to comparing the
+content hash.
+
+Builds are serialized across processes with a lock file next to the cache, so
+when several workers start on a cold cache one of them builds it and the
+others wait and reuse it.
+
+The cache can also be built ahead of a deploy::
+
+    python -m datastore.cache [--force] [--chunksize N] [source.csv]
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import shutil
+import time
+
+import pandas as pd
+
+from datastore.ingest import CHUNK_ROWS, RejectionReport, iter_sales
+from datastore.partitions import PartitionedStore, PartitionWriter
+from datastore.paths import CACHE_PATH, SOURCE_FILE
+from datastore.rollups import ROLLUPS
+from datastore.schema import MemoryReport
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever ingestion reads or derives different columns so stale caches rebuild.
+CACHE_VERSION = 15
+
+
+def cache_dir(source: pathlib.Path) -> pathlib.Path:
+    return CACHE_PATH.joinpath(source.stem)
+
+
+def rollup_file(source: pathlib.Path, name: str) -> pathlib.Path:
+    return CACHE_PATH.joinpath(f"{source.stem}.{name}.parquet")
+
+
+def meta_file(source: pathlib.Path) -> pathlib.Path:
+    return CACHE_PATH.joinpath(f"{source.stem}.json")
+
+
+def file_hash(path: pathlib.Path, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint(source: pathlib.Path) -> dict:
+    stat = source.stat()
+    return {
+        "version": CACHE_VERSION,
+        "source": source.name,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": file_hash(source),
+    }
+
+
+def _read_meta(source: pathlib.Path) -> dict | None:
+    try:
+        with open(meta_file(source)) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomic(path: pathlib.Path, write) -> None:
+    # Several gunicorn workers may race to build the same cache on a cold
+    # start; each writes its own temporary file and the last rename wins.
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def _write_meta(source: pathlib.Path, meta: dict) -> None:
+    def write(tmp):
+        with open(tmp, "w") as fh:
+            json.dump(meta, fh, indent=2)
+
+    _write_atomic(meta_file(source), write)
+
+
+def is_fresh(source: pathlib.Path = SOURCE_FILE) -> bool:
+    meta = _read_meta(source)
+    if meta is None or meta.get("version") != CACHE_VERSION:
+        return False
+    outputs = [cache_dir(source)] + [rollup_file(source, rollup.name) for rollup in ROLLUPS]
+    if not all(path.exists() for path in outputs):
+        return False
+
+    stat = source.stat()
+    if meta["size"] != stat.st_size:
+        return False
+    if meta["mtime_ns"] == stat.st_mtime_ns:
+        return True
+
+    # Touched but possibly unchanged (e.g. re-downloaded or copied): compare
+    # content and remember the new mtime so the hash is not recomputed again.
+    if meta["sha256"] != file_hash(source):
+        return False
+    meta["mtime_ns"] = stat.st_mtime_ns
+    _write_meta(source, meta)
+    return True
+
+
+def lock_file(source: pathlib.Path) -> pathlib.Path:
+    return CACHE_PATH.joinpath(f".{source.stem}.lock")
+
+
+@contextlib.contextmanager
+def build_lock(source: pathlib.Path):
+    """Hold the exclusive build lock of ``source``'s cache, waiting for it if needed."""
+    CACHE_PATH.mkdir(parents=True, exist_ok=True)
+    with open(lock_file(source), "w") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _replace_dir(tmp: pathlib.Path, path: pathlib.Path) -> None:
+    # A directory cannot be renamed over a non-empty one, so the previous
+    # build is moved aside first and removed once the new one is in place.
+    old = path.with_name(f".{path.name}.{os.getpid()}.old")
+    if path.exists():
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def build(source: pathlib.Path = SOURCE_FILE, chunksize: int = CHUNK_ROWS) -> None:
+    start = time.perf_counter()
+    report = RejectionReport()
+    memory = MemoryReport()
+    rollups = [rollup() for rollup in ROLLUPS]
+
+    CACHE_PATH.mkdir(parents=True, exist_ok=True)
+    tmp = CACHE_PATH.joinpath(f".{source.stem}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    try:
+        writer = PartitionWriter(tmp)
+        try:
+            for chunk in iter_sales(source, chunksize, report, memory):
+                writer.add(chunk)
+                for rollup in rollups:
+                    rollup.add(chunk)
+        finally:
+            manifest = writer.close()
+        if not manifest["partitions"]:
+            raise ValueError(f"{source} has no complete rows")
+        PartitionedStore(tmp, manifest).export_shared()
+        _replace_dir(tmp, cache_dir(source))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    for rollup in rollups:
+        result = rollup.result()
+        _write_atomic(rollup_file(source, rollup.name), lambda tmp: result.to_parquet(tmp, index=False))
+    _write_meta(source, {**fingerprint(source), "rejections": report.as_dict(), **manifest})
+
+    logger.info("%s: %s", source.name, report)
+    memory.log()
+    logger.info(
+        "built cache %s (%d rows, %d partitions) in %.2fs",
+        cache_dir(source),
+        report.rows_kept,
+        len(manifest["partitions"]),
+        time.perf_counter() - start,
+    )
+
+
+def ensure(source: pathlib.Path = SOURCE_FILE) -> None:
+    """Build the cache unless it is fresh."""
+    if is_fresh(source):
+        return
+    with build_lock(source):
+        # Another process may have built it while this one waited.
+        if not is_fresh(source):
+            build(source)
+
+
+def open_partitions(source: pathlib.Path = SOURCE_FILE) -> PartitionedStore:
+    """Open the partitioned cache, building it first when it is stale."""
+    ensure(source)
+    return PartitionedStore(cache_dir(source), _read_meta(source))
+
+
+def load_rollup(name: str, source: pathlib.Path = SOURCE_FILE) -> pd.DataFrame:
+    ensure(source)
+    return pd.read_parquet(rollup_file(source, name))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Build the Parquet cache of the sales export.")
+    parser.add_argument("source", nargs="?", type=pathlib.Path, default=SOURCE_FILE)
+    parser.add_argument("--force", action="store_true", help="rebuild even if the cache is fresh")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_ROWS, help="rows read per chunk")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    with build_lock(args.source):
+        fresh = not args.force and is_fresh(args.source)
+        if not fresh:
+            build(args.source, args.chunksize)
+    if fresh:
+        logger.info("cache %s is up to date", cache_dir(args.source))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Calendar features derived through a date dimension table.
+
+A sales export has one row per invoice line but only a few hundred distinct
+dates per year. The raw ``date`` column is factorized once, only the distinct
+values are parsed, and every calendar feature is computed on that small date
+dimension. Rows pick their features up with an integer take on the factorize
+codes, so the parsing and feature work scales with the number of dates rather
+than the number of rows.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+season_dict = {1: 'Winter',
+               2: 'Winter',
+               3: 'Spring',
+               4: 'Spring',
+               5: 'Spring',
+               6: 'Summer',
+               7: 'Summer',
+               8: 'Summer',
+               9: 'Fall',
+               10: 'Fall',
+               11: 'Fall',
+               12: 'Winter'}
+
+# Indexed by month number; slot 0 is unused.
+SEASON_BY_MONTH = np.array([None] + [season_dict[m] for m in range(1, 13)], dtype=object)
+
+def date_dimension(dates: pd.DatetimeIndex) -> pd.DataFrame:
+    """One row of calendar features per date in ``dates``.
+
+    ``date_key`` is the date as a ``yyyymmdd`` integer, which sorts like the
+    date itself and fits in 32 bits.
+    """
+    year = dates.year.to_numpy()
+    month = dates.month.to_numpy()
+    day = dates.day.to_numpy()
+    return pd.DataFrame(
+        {
+            "date_key": (year * 10000 + month * 100 + day).astype(np.int32),
+            "yyyy": year,
+            "mm": month,
+            "dd": day,
+            "wk": dates.isocalendar().week.to_numpy(dtype=np.int64),
+            "season": SEASON_BY_MONTH[month],
+        }
+    )
+
+
+def iso_year(yyyy, mm, wk) -> np.ndarray:
+    """The ISO year each (year, month, ISO week) falls in.
+
+    Late December days can belong to week 1 of the next ISO year and early
+    January days to week 52 or 53 of the previous one; ``wk`` alone does not
+    say which, but together with the month it does.
+    """
+    yyyy = np.asarray(yyyy, dtype=np.int16)
+    mm = np.asarray(mm)
+    wk = np.asarray(wk)
+    return yyyy + np.where((mm == 12) & (wk == 1), 1, 0) - np.where((mm == 1) & (wk >= 52), 1, 0)
+
+
+def derive_calendar(dates: pd.Series) -> pd.DataFrame:
+    """Calendar features for every row of ``dates``, aligned on its index."""
+    codes, uniques = pd.factorize(dates)
+    if (codes < 0).any():
+        raise ValueError("derive_calendar() requires a date on every row")
+
+    dimension = date_dimension(pd.DatetimeIndex(pd.to_datetime(np.asarray(uniques, dtype=object))))
+    features = dimension.take(codes)
+    features.index = dates.index
+    return features
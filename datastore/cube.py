@@ -0,0 +1,45 @@
+"""Constant-time lookups into a rollup.
+
+A ``MeasureCube`` indexes every row of a rollup by its key tuple, so asking
+for the measures of one cell is a dict lookup rather than a scan. Cells with
+no sales read as zeros.
+"""
+from __future__ import annotations
+
+import math
+
+import pandas as pd
+
+
+class MeasureCube:
+    def __init__(self, rollup: pd.DataFrame, keys: list[str]):
+        self.keys = list(keys)
+        self.measures = [column for column in rollup.columns if column not in self.keys]
+        cells = rollup.set_index(self.keys).to_dict("index")
+        if len(self.keys) == 1:
+            cells = {(key,): cell for key, cell in cells.items()}
+        self._cells = cells
+        self._empty = dict.fromkeys(self.measures, 0)
+
+    def get(self, *key) -> dict:
+        return self._cells.get(key, self._empty)
+
+    def total(self, keys) -> dict:
+        """Measures summed over the cells at ``keys``; missing cells count as zero."""
+        total = dict(self._empty)
+        for key in keys:
+            cell = self._cells.get(key)
+            if cell is not None:
+                for measure in self.measures:
+                    total[measure] += cell[measure]
+        return total
+
+    def __contains__(self, key) -> bool:
+        return key in self._cells
+
+
+def pct_change(current, previous) -> float:
+    """Percentage change from ``previous``; NaN when there is nothing to compare with."""
+    if not previous:
+        return math.nan
+    return (current - previous) / previous * 100
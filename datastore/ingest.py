@@ -0,0 +1,128 @@
+"""Reading the raw Iowa liquor sales export.
+
+Only the columns the dashboards use are read, each with an explicit dtype so
+the CSV parser never has to infer types. Rows are rejected only when a
+required field is missing; optional fields may be null and are kept.
+
+Order counts are row counts, so ``invoice_and_item_number`` is not read.
+"""
+from __future__ import annotations
+
+import dataclasses
+import pathlib
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from datastore.calendar import derive_calendar
+from datastore.paths import SOURCE_FILE
+from datastore.schema import MemoryReport, apply_schema
+from datastore.wkt import parse_points
+
+READ_DTYPES = {
+    "date": "category",
+    "store_name": "category",
+    "store_location": "category",
+    "city": "category",
+    "county": "category",
+    "vendor_number": "category",
+    "item_description": "category",
+    "bottle_volume_ml": np.float32,
+    "state_bottle_cost": np.float64,
+    "bottles_sold": "Int32",
+    "sale_dollars": np.float64,
+    "volume_sold_liters": np.float32,
+    "volume_sold_gallons": np.float32,
+}
+
+USECOLS = list(READ_DTYPES)
+
+CHUNK_ROWS = 1_000_000
+
+# A row without one of these cannot be placed on the calendar, attributed to a
+# product or added to the totals, so it is dropped.
+REQUIRED = ["date", "item_description", "bottles_sold", "sale_dollars", "state_bottle_cost"]
+
+
+@dataclasses.dataclass
+class RejectionReport:
+    """Rows read and dropped during ingestion, with per-field null counts.
+
+    A row missing several required fields is counted under each of them, so
+    the per-field counts may add up to more than ``rejected``.
+    """
+
+    rows_read: int = 0
+    rows_kept: int = 0
+    missing: dict = dataclasses.field(default_factory=dict)
+
+    @property
+    def rejected(self) -> int:
+        return self.rows_read - self.rows_kept
+
+    def as_dict(self) -> dict:
+        return {
+            "rows_read": self.rows_read,
+            "rows_kept": self.rows_kept,
+            "rejected": self.rejected,
+            "missing": dict(self.missing),
+        }
+
+    def __str__(self) -> str:
+        reasons = ", ".join(f"{column}: {count:,}" for column, count in self.missing.items() if count)
+        return (
+            f"kept {self.rows_kept:,} of {self.rows_read:,} rows, "
+            f"rejected {self.rejected:,} ({reasons or 'none'})"
+        )
+
+
+def drop_incomplete(df: pd.DataFrame, report: RejectionReport) -> pd.DataFrame:
+    nulls = df[REQUIRED].isna()
+    for column in REQUIRED:
+        report.missing[column] = report.missing.get(column, 0) + int(nulls[column].sum())
+
+    keep = ~nulls.any(axis=1)
+    report.rows_read += len(df)
+    report.rows_kept += int(keep.sum())
+    return df[keep]
+
+
+def iter_sales(
+    path: pathlib.Path = SOURCE_FILE,
+    chunksize: int = CHUNK_ROWS,
+    report: RejectionReport | None = None,
+    memory: MemoryReport | None = None,
+) -> Iterator[pd.DataFrame]:
+    """Yield the export as derived chunks of at most ``chunksize`` rows.
+
+    Rejections of every chunk are accumulated into ``report`` and per-column
+    memory usage into ``memory``; without a ``memory`` the summed usage is
+    logged once the last chunk has been read. Categories are local to each
+    chunk, so chunks should not be concatenated as is.
+    """
+    report = report if report is not None else RejectionReport()
+    log_memory = memory is None
+    memory = memory if memory is not None else MemoryReport()
+    with pd.read_csv(path, usecols=USECOLS, dtype=READ_DTYPES, chunksize=chunksize) as reader:
+        for chunk in reader:
+            chunk = drop_incomplete(chunk, report)
+            if len(chunk):
+                yield derive(chunk, memory=memory)
+    if log_memory:
+        memory.log()
+
+
+def derive(df: pd.DataFrame, memory: MemoryReport) -> pd.DataFrame:
+    """Add calendar and location columns and apply the in-memory schema.
+
+    Memory usage before and after the schema is added to ``memory``.
+    """
+    df = pd.concat([df, derive_calendar(df["date"])], axis=1)
+
+    df["lon"], df["lat"] = parse_points(df["store_location"])
+    df = df.drop(columns=["date", "store_location"])
+
+    typed = apply_schema(df)
+    memory.add(df, typed)
+    return typed
@@ -0,0 +1,185 @@
+"""Year/month partitioned layout of the cached sales frame.
+
+The cache directory holds one Parquet file per (year, month)::
+
+    <name>/2021/01.parquet
+    <name>/2021/02.parquet
+    ...
+
+``PartitionWriter`` appends derived ingest chunks to the right files and
+collects the manifest: the partitions with their row counts and the
+vocabulary of every categorical dimension.
+
+Each year is then exported as date-sorted, memory-mapped columns shared by
+all worker processes (see ``datastore.shared``). ``PartitionedStore`` answers
+queries from the manifest and maps a year only when a query touches it,
+keeping at most ``max_resident`` years mapped (least recently used first out).
+Month and year-to-date queries are row slices of the mapped year, so they
+neither scan nor copy. All years share the manifest's categories, so frames
+concatenated from several of them stay categorical.
+"""
+from __future__ import annotations
+
+import collections
+import itertools
+import os
+import pathlib
+import threading
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from datastore.schema import CATEGORICAL, SEASONS
+from datastore.shared import columns_dir, map_year, write_year
+
+PARTITION_KEYS = ["yyyy", "mm"]
+
+MAX_RESIDENT = int(os.environ.get("IOWA_RESIDENT_YEARS", 3))
+
+
+def partition_file(root: pathlib.Path, year: int, month: int) -> pathlib.Path:
+    return root.joinpath(f"{year}", f"{month:02d}.parquet")
+
+
+def file_schema(chunk: pd.DataFrame) -> pa.Schema:
+    # Categories differ from chunk to chunk, so dictionary columns are written
+    # as plain strings (Parquet dictionary-encodes them on disk anyway) and
+    # turned back into categoricals when a partition is read.
+    schema = pa.Schema.from_pandas(chunk, preserve_index=False).remove_metadata()
+    return pa.schema(
+        pa.field(field.name, pa.string()) if pa.types.is_dictionary(field.type) else field
+        for field in schema
+    )
+
+
+class PartitionWriter:
+    def __init__(self, root: pathlib.Path):
+        self.root = root
+        self._schema = None
+        self._writers = {}
+        self._rows = collections.Counter()
+        self._vocabulary = {column: set() for column in CATEGORICAL}
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        if self._schema is None:
+            self._schema = file_schema(chunk)
+
+        for column, values in self._vocabulary.items():
+            values.update(chunk[column].cat.remove_unused_categories().cat.categories)
+
+        for (year, month), part in chunk.groupby(PARTITION_KEYS, sort=False):
+            key = (int(year), int(month))
+            writer = self._writers.get(key)
+            if writer is None:
+                path = partition_file(self.root, *key)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                writer = self._writers[key] = pq.ParquetWriter(path, self._schema)
+            writer.write_table(pa.Table.from_pandas(part, preserve_index=False).cast(self._schema))
+            self._rows[key] += len(part)
+
+    def close(self) -> dict:
+        """Close every partition file and return the manifest."""
+        for writer in self._writers.values():
+            writer.close()
+        return {
+            "partitions": [
+                {"yyyy": year, "mm": month, "rows": rows}
+                for (year, month), rows in sorted(self._rows.items())
+            ],
+            "dimensions": {
+                column: sorted(values) for column, values in self._vocabulary.items()
+            },
+        }
+
+
+class PartitionedStore:
+    def __init__(self, root: pathlib.Path, manifest: dict, max_resident: int = MAX_RESIDENT):
+        self.root = root
+        self.manifest = manifest
+        self.max_resident = max_resident
+        self.rows = {(p["yyyy"], p["mm"]): p["rows"] for p in manifest["partitions"]}
+        self.dtypes = {
+            column: pd.CategoricalDtype(values)
+            for column, values in manifest["dimensions"].items()
+        }
+        self.dtypes["season"] = SEASONS
+        self._resident = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._empty = None
+
+    def partitions(self) -> list[tuple[int, int]]:
+        return list(self.rows)
+
+    def years(self) -> list[int]:
+        return sorted({year for year, _ in self.rows})
+
+    def dimension(self, column: str) -> list:
+        return list(self.manifest["dimensions"][column])
+
+    def _read_file(self, path: pathlib.Path) -> pd.DataFrame:
+        table = pq.read_table(path, read_dictionary=list(self.dtypes))
+        return table.to_pandas().astype(self.dtypes)
+
+    def export_shared(self) -> None:
+        """Write the shared, date-sorted columns of every year (build time only)."""
+        for year in self.years():
+            rows = {month: n for (y, month), n in self.rows.items() if y == year}
+            write_year(
+                columns_dir(self.root, year),
+                rows,
+                lambda month: self._read_file(partition_file(self.root, year, month)),
+            )
+
+    def _names(self) -> list[str]:
+        year, month = next(iter(self.rows))
+        return pq.read_schema(partition_file(self.root, year, month)).names
+
+    def empty(self) -> pd.DataFrame:
+        if self._empty is None:
+            year, month = next(iter(self.rows))
+            schema = pq.read_schema(partition_file(self.root, year, month))
+            self._empty = schema.empty_table().to_pandas().astype(self.dtypes)
+        return self._empty
+
+    def _year(self, year: int) -> tuple[pd.DataFrame, np.ndarray]:
+        with self._lock:
+            block = self._resident.get(year)
+            if block is not None:
+                self._resident.move_to_end(year)
+                return block
+
+            block = map_year(columns_dir(self.root, year), self._names(), self.dtypes)
+            self._resident[year] = block
+            while len(self._resident) > self.max_resident:
+                self._resident.popitem(last=False)
+            return block
+
+    def partition(self, year: int, month: int) -> pd.DataFrame:
+        """Rows of one month; an empty frame if the month has no sales."""
+        return self.frame(year, [month])
+
+    def frame(self, year: int, months: Iterable[int] | None = None) -> pd.DataFrame:
+        """Rows of ``year`` in date order, limited to ``months`` when given.
+
+        Consecutive months come back as a zero-copy slice of the mapped year;
+        only a selection with gaps needs a concatenation.
+        """
+        if months is None:
+            months = range(1, 13)
+        else:
+            months = sorted({month for month in months if 1 <= month <= 12})
+        if not any((year, month) in self.rows for month in months):
+            return self.empty()
+
+        df, offsets = self._year(year)
+        slices = []
+        # Split the months into runs of consecutive numbers.
+        for _, run in itertools.groupby(enumerate(months), lambda item: item[1] - item[0]):
+            run = [month for _, month in run]
+            slices.append(df.iloc[offsets[run[0] - 1]:offsets[run[-1]]])
+        if len(slices) == 1:
+            return slices[0]
+        return pd.concat(slices, ignore_index=True)
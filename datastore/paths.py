@@ -0,0 +1,6 @@
+import pathlib
+
+PATH = pathlib.Path(__file__).parent.parent
+DATA_PATH = PATH.joinpath("pages", "data").resolve()
+CACHE_PATH = DATA_PATH.joinpath("cache")
+SOURCE_FILE = DATA_PATH.joinpath("liquor_iowa_2021.csv")
@@ -0,0 +1,141 @@
+"""Aggregates folded chunk by chunk while the sales export is ingested.
+
+Each rollup is a fold: ``add`` is called with every derived chunk and
+``result`` combines the partial aggregates once the whole file has been read.
+Partials are tiny compared to the chunks, so folding keeps peak memory bounded
+by the chunk size no matter how large the export is.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from datastore.calendar import iso_year
+
+
+class SumRollup:
+    """Row count, measure sums, non-null and distinct counts grouped by ``keys``.
+
+    ``counts`` maps an output column to the column whose non-null values it
+    counts. ``distinct`` maps an output column to the dimension whose distinct
+    values it counts. Distinct counts do not add up across chunks, so the distinct
+    (keys, value) pairs are kept instead and counted at the end; there are
+    far fewer of them than rows.
+    """
+
+    name = None
+    keys = []
+    measures = []
+    counts = {}
+    distinct = {}
+
+    def __init__(self):
+        self._parts = []
+        self._pairs = dict.fromkeys(self.distinct)
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        # Money is held as int32 cents and volumes as float32; widen before
+        # summing so totals cannot overflow or lose precision.
+        measures = chunk[self.measures]
+        widened = {
+            column: np.int64 if pd.api.types.is_integer_dtype(dtype) else np.float64
+            for column, dtype in measures.dtypes.items()
+        }
+        values = chunk[self.keys].join(measures.astype(widened))
+        grouped = values.groupby(self.keys, observed=True)
+        part = grouped[self.measures].sum()
+        part["rows"] = grouped.size()
+        for name, column in self.counts.items():
+            part[name] = chunk.groupby(self.keys, observed=True)[column].count()
+        # Categories are local to each chunk, so categorical keys are turned
+        # into plain values before the partials are combined.
+        part = part.reset_index()
+        for key in self.keys:
+            if isinstance(part[key].dtype, pd.CategoricalDtype):
+                part[key] = part[key].astype(object)
+        self._parts.append(part.set_index(self.keys))
+
+        for name, column in self.distinct.items():
+            pairs = chunk[[*self.keys, column]].dropna().drop_duplicates()
+            # Categories are local to each chunk; compare the values themselves.
+            pairs[column] = pairs[column].astype(object)
+            seen = self._pairs[name]
+            self._pairs[name] = pairs if seen is None else pd.concat([seen, pairs]).drop_duplicates()
+
+    def result(self) -> pd.DataFrame:
+        if not self._parts:
+            return pd.DataFrame(columns=[*self.keys, *self.measures, "rows", *self.counts, *self.distinct])
+        combined = pd.concat(self._parts).groupby(level=self.keys).sum()
+        for name in self.distinct:
+            counts = self._pairs[name].groupby(self.keys).size()
+            combined[name] = counts.reindex(combined.index, fill_value=0)
+        return combined.reset_index()
+
+
+class MonthlyCube(SumRollup):
+    """Year x month cube of the sales header card measures."""
+
+    name = "monthly"
+    keys = ["yyyy", "mm"]
+    measures = ["bottles_sold", "sale_dollars", "state_bottle_cost"]
+    distinct = {"vendors": "vendor_number", "items": "item_description", "cities": "city"}
+
+
+class YearlyKPIs(SumRollup):
+    """Per-year totals behind the finance header cards."""
+
+    name = "yearly"
+    keys = ["yyyy"]
+    measures = ["bottles_sold", "sale_dollars", "state_bottle_cost"]
+    distinct = {"vendors": "vendor_number", "items": "item_description"}
+
+
+class ProductMonthly(SumRollup):
+    """Year x month x product orders, stores and measures for the product cards.
+
+    ``rows`` is the order count; ``stores`` counts the orders placed by a
+    known store.
+    """
+
+    name = "product_monthly"
+    keys = ["yyyy", "mm", "item_description"]
+    measures = ["bottles_sold", "sale_dollars"]
+    counts = {"stores": "store_name"}
+
+
+class CountyMonthly(SumRollup):
+    """Year x month x county measures for the county rankings and charts."""
+
+    name = "county_monthly"
+    keys = ["yyyy", "mm", "county"]
+    measures = ["bottles_sold", "sale_dollars"]
+
+
+class WeeklyRevenue(SumRollup):
+    """ISO year x ISO week measures for the finance revenue chart.
+
+    Weeks are keyed by their ISO year so the days of a week that straddles
+    New Year land in one bar instead of being split across two years.
+    """
+
+    name = "weekly"
+    keys = ["iso_year", "wk"]
+    measures = ["bottles_sold", "sale_dollars"]
+
+    def add(self, chunk: pd.DataFrame) -> None:
+        keys = pd.DataFrame(
+            {"iso_year": iso_year(chunk["yyyy"], chunk["mm"], chunk["wk"]), "wk": chunk["wk"].to_numpy()},
+            index=chunk.index,
+        )
+        super().add(keys.join(chunk[self.measures]))
+
+
+class ProductSeasons(SumRollup):
+    """Year x product x season totals of every measure offered by the season pie."""
+
+    name = "product_seasons"
+    keys = ["yyyy", "item_description", "season"]
+    measures = ["volume_sold_liters", "volume_sold_gallons", "bottle_volume_ml", "sale_dollars"]
+
+
+ROLLUPS = [MonthlyCube, YearlyKPIs, ProductMonthly, CountyMonthly, WeeklyRevenue, ProductSeasons]
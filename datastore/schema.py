@@ -0,0 +1,129 @@
+"""Declared in-memory schema of the sales frame.
+
+Dimension columns are stored as categoricals, calendar parts and counts as the
+narrowest integer type that holds them, and dollar amounts as integer cents.
+Cents keep money sums exact and halve the footprint of float64 dollars; use
+``to_dollars`` on anything summed from a money column before displaying it.
+"""
+from __future__ import annotations
+
+import logging
+import sys
+
+import numpy as np
+import pandas as pd
+
+from datastore.calendar import season_dict
+
+logger = logging.getLogger(__name__)
+
+SEASONS = pd.CategoricalDtype(["Winter", "Spring", "Summer", "Fall"])
+assert set(SEASONS.categories) == set(season_dict.values())
+
+CATEGORICAL = [
+    "county",
+    "city",
+    "store_name",
+    "vendor_number",
+    "item_description",
+]
+
+SCHEMA = {
+    "date_key": np.int32,
+    "yyyy": np.int16,
+    "mm": np.int8,
+    "dd": np.int8,
+    "wk": np.int8,
+    "season": SEASONS,
+    "bottles_sold": np.int32,
+    "bottle_volume_ml": np.float32,
+    "volume_sold_liters": np.float32,
+    "volume_sold_gallons": np.float32,
+    **{column: "category" for column in CATEGORICAL},
+}
+
+MONEY_COLUMNS = ["sale_dollars", "state_bottle_cost", "state_bottle_retail"]
+CENTS = 100
+
+
+def to_cents(dollars: pd.Series) -> pd.Series:
+    return (dollars * CENTS).round().astype(np.int32)
+
+
+def to_dollars(cents):
+    """Convert a cents value, array or series back to dollars."""
+    return cents / CENTS
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast every schema column present in ``df``; other columns are kept as is."""
+    dtypes = {column: dtype for column, dtype in SCHEMA.items() if column in df}
+    df = df.astype(dtypes)
+    for column in MONEY_COLUMNS:
+        if column in df:
+            df[column] = to_cents(df[column])
+    return df
+
+
+def object_bytes(column: pd.Series) -> int:
+    """Deep memory usage of a categorical column if it held Python strings.
+
+    Counted the way ``memory_usage(deep=True)`` counts an object column: one
+    pointer per row plus the size of each row's object.
+    """
+    sizes = column.cat.categories.map(sys.getsizeof).to_numpy(np.int64)
+    codes = column.cat.codes.to_numpy()
+    present = codes >= 0
+    missing = len(codes) - int(present.sum())
+    return int(8 * len(codes) + sizes[codes[present]].sum() + missing * sys.getsizeof(np.nan))
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """Per-column dtype and deep memory usage of two versions of a frame.
+
+    The dimension columns are read as categoricals already, so categorical
+    columns of ``before`` are measured as the object strings a plain
+    ``read_csv`` would give; the report then shows what the categories save.
+    """
+    dtypes = before.dtypes.astype(str)
+    sizes = before.memory_usage(index=False, deep=True)
+    for column in before.select_dtypes("category"):
+        dtypes[column] = "object"
+        sizes[column] = object_bytes(before[column])
+    report = pd.DataFrame(
+        {
+            "dtype_before": dtypes,
+            "bytes_before": sizes,
+            "dtype_after": after.dtypes.astype(str),
+            "bytes_after": after.memory_usage(index=False, deep=True),
+        }
+    )
+    report["saved"] = report["bytes_before"] - report["bytes_after"]
+    report.loc["total"] = report[["bytes_before", "bytes_after", "saved"]].sum()
+    return report
+
+
+class MemoryReport:
+    """``memory_report`` summed over the chunks of one ingest and logged once."""
+
+    SIZES = ["bytes_before", "bytes_after", "saved"]
+
+    def __init__(self):
+        self.report = None
+
+    def add(self, before: pd.DataFrame, after: pd.DataFrame) -> None:
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        report = memory_report(before, after).drop(index="total")
+        if self.report is None:
+            self.report = report
+        else:
+            sizes = self.report[self.SIZES].add(report[self.SIZES], fill_value=0)
+            self.report[self.SIZES] = sizes.astype(np.int64)
+
+    def log(self) -> None:
+        if self.report is None:
+            return
+        report = self.report.copy()
+        report.loc["total"] = report[self.SIZES].sum()
+        logger.info("sales frame memory by column:\n%s", report.to_string())
@@ -0,0 +1,91 @@
+"""Memory-mapped, date-sorted column store shared between worker processes.
+
+Next to the Parquet month files the cache keeps one ``.npy`` file per column
+and year, with the year's rows sorted by date, plus the month boundaries::
+
+    <name>/2021/01.parquet
+    ...
+    <name>/2021/columns/bottles_sold.npy
+    <name>/2021/columns/county.npy
+    <name>/2021/columns/months.npy
+    ...
+
+``months.npy`` holds 13 row offsets: month ``m`` occupies rows
+``offsets[m - 1]:offsets[m]``, so any run of consecutive months (a month, a
+year to date) is a contiguous slice of every column.
+
+Workers map these files read-only instead of reading them onto their heap, so
+N gunicorn workers share a single physical copy through the page cache.
+Dimension codes refer to the manifest vocabulary and are stored in the integer
+width pandas itself picks for that many categories, so wrapping them in a
+``Categorical`` does not copy them either.
+"""
+from __future__ import annotations
+
+import pathlib
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+OFFSETS = "months"
+
+
+def columns_dir(root: pathlib.Path, year: int) -> pathlib.Path:
+    return root.joinpath(f"{year}", "columns")
+
+
+def _values(column: pd.Series) -> np.ndarray:
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column.cat.codes.to_numpy()
+    return column.to_numpy()
+
+
+def write_year(
+    directory: pathlib.Path,
+    rows: dict[int, int],
+    read_month: Callable[[int], pd.DataFrame],
+) -> None:
+    """Write one year's columns, sorted by date, one month in memory at a time.
+
+    ``rows`` maps each month with sales to its row count and ``read_month``
+    returns that month's rows with the manifest categorical dtypes.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    offsets = np.zeros(13, dtype=np.int64)
+    for month in range(1, 13):
+        offsets[month] = offsets[month - 1] + rows.get(month, 0)
+
+    arrays = {}
+    for month in sorted(rows):
+        df = read_month(month)
+        order = np.argsort(df["date_key"].to_numpy(), kind="stable")
+        start, stop = offsets[month - 1], offsets[month]
+        for name in df.columns:
+            values = _values(df[name])[order]
+            if name not in arrays:
+                arrays[name] = np.lib.format.open_memmap(
+                    directory.joinpath(f"{name}.npy"),
+                    mode="w+",
+                    dtype=values.dtype,
+                    shape=(int(offsets[12]),),
+                )
+            arrays[name][start:stop] = values
+
+    for array in arrays.values():
+        array.flush()
+    np.save(directory.joinpath(f"{OFFSETS}.npy"), offsets)
+
+
+def map_year(directory: pathlib.Path, names: list[str], dtypes: dict) -> tuple[pd.DataFrame, np.ndarray]:
+    """A read-only frame over one year's columns and its month offsets."""
+    columns = {}
+    for name in names:
+        values = np.load(directory.joinpath(f"{name}.npy"), mmap_mode="r")
+        if name in dtypes:
+            values = pd.Categorical.from_codes(values, dtype=dtypes[name])
+        columns[name] = values
+    offsets = np.load(directory.joinpath(f"{OFFSETS}.npy"))
+    # copy=False keeps every column in its own block, so the memory-mapped
+    # arrays are used in place rather than consolidated onto the heap.
+    return pd.DataFrame(columns, copy=False), offsets
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import logging
+import os
+import pathlib
+import threading
+from typing import Callable, Iterable
+
+import pandas as pd
+
+from datastore import cache
+from datastore.cube import MeasureCube
+from datastore.partitions import PartitionedStore
+from datastore.paths import SOURCE_FILE
+from datastore.rollups import ROLLUPS
+from datastore.topn import Rankings
+from datastore.ytd import YearToDate
+
+logger = logging.getLogger(__name__)
+
+TOTAL = "Total"
+
+
+class DataStore:
+    """Process-wide entry point to the sales data and its rollups.
+
+    The partitioned cache is opened on first access and shared by every page.
+    A year's columns are only mapped when a query touches them; rollups are
+    small and stay resident once loaded. Row-level queries return read-only
+    slices of the mapped columns: adding or replacing columns on them never
+    leaks into other pages, while the underlying data is not duplicated.
+
+    Nothing is read when the store is created. ``warm_up`` opens the cache on
+    a background thread so the server can bind and answer health checks while
+    a cold cache is still being built. It starts at most one thread per
+    process, and a forked child starts with fresh locks: a server that
+    imports the app before forking its workers (``gunicorn --preload``) must
+    not hand them a lock held by a thread that only exists in the parent.
+
+    ``reload`` drops everything derived from the cache and reopens it; the
+    functions registered with ``on_reload`` are called afterwards so caches
+    built on top of the store can be cleared.
+    """
+
+    def __init__(self, source: pathlib.Path = SOURCE_FILE):
+        self.source = source
+        self.error = None
+        self._partitions = None
+        self._rollups = {}
+        self._cubes = {}
+        self._ytd = {}
+        self._rankings = Rankings(self._ranking_source)
+        self._grids = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._partitions is not None and all(
+            rollup.name in self._rollups for rollup in ROLLUPS
+        )
+
+    @property
+    def version(self) -> str | None:
+        """Identifies the loaded dataset; None until the cache is open."""
+        partitions = self._partitions
+        if partitions is None:
+            return None
+        return f"{partitions.manifest['version']}:{partitions.manifest['sha256'][:16]}"
+
+    def on_reload(self, listener: Callable[[DataStore], None]) -> None:
+        self._listeners.append(listener)
+
+    def reload(self) -> None:
+        with self._lock:
+            self.error = None
+            self._partitions = None
+            self._rollups = {}
+            self._cubes = {}
+            self._ytd = {}
+            self._grids = {}
+            self._rankings.clear()
+        self._warm_up()
+        for listener in self._listeners:
+            listener(self)
+
+    def warm_up(self) -> threading.Thread:
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._warm_up, name="datastore-warm-up", daemon=True)
+                self._thread.start()
+            return self._thread
+
+    def _warm_up(self) -> None:
+        try:
+            self.partitions()
+            for rollup in ROLLUPS:
+                self.rollup(rollup.name)
+        except Exception as exc:
+            self.error = exc
+            logger.exception("warming up the data store failed")
+
+    def partitions(self) -> PartitionedStore:
+        if self._partitions is None:
+            with self._lock:
+                if self._partitions is None:
+                    self._partitions = cache.open_partitions(self.source)
+        return self._partitions
+
+    def year(self, year: int, months: Iterable[int] | None = None) -> pd.DataFrame:
+        return self.partitions().frame(year, months)
+
+    def month(self, year: int, month: int) -> pd.DataFrame:
+        return self.partitions().partition(year, month)
+
+    def rollup(self, name: str) -> pd.DataFrame:
+        if name not in self._rollups:
+            with self._lock:
+                if name not in self._rollups:
+                    self._rollups[name] = cache.load_rollup(name, self.source)
+        return self._rollups[name].copy(deep=False)
+
+    def cube(self, name: str) -> MeasureCube:
+        if name not in self._cubes:
+            rollup = next(rollup for rollup in ROLLUPS if rollup.name == name)
+            self._cubes[name] = MeasureCube(self.rollup(name), rollup.keys)
+        return self._cubes[name]
+
+    def ytd(self, name: str) -> YearToDate:
+        """Running month totals of a year x month x dimension rollup."""
+        if name not in self._ytd:
+            rollup = next(rollup for rollup in ROLLUPS if rollup.name == name)
+            self._ytd[name] = YearToDate(self.rollup(name), rollup.keys[-1])
+        return self._ytd[name]
+
+    def month_grid(self, name: str, year: int, measure: str) -> pd.DataFrame:
+        """Members x months table of ``measure`` for one year.
+
+        The last row, ``Total``, holds the month totals of all sales from the
+        monthly cube, including rows whose member is unknown.
+        """
+        key = (name, year, measure)
+        if key not in self._grids:
+            grid = self.ytd(name).months(year, measure)
+            monthly = self.cube("monthly")
+            grid.loc[TOTAL] = [monthly.get(year, mm)[measure] for mm in grid.columns]
+            self._grids[key] = grid
+        return self._grids[key]
+
+    def _ranking_source(self, name: str, year: int, month: int | None) -> pd.DataFrame:
+        if month is None:
+            rollup = self.rollup(name)
+            return rollup[rollup["yyyy"] == year]
+        return self.ytd(name).through(year, month)
+
+    def top(
+        self,
+        name: str,
+        year: int,
+        month: int | None,
+        measure: str,
+        n: int,
+        ties: str | None = None,
+    ) -> pd.DataFrame:
+        """The ``n`` largest members by ``measure``, in ascending order.
+
+        With a month, members are ranked on their totals through that month;
+        without one, the year's rollup cells are ranked as they are.
+        """
+        return self._rankings.top(name, year, month, measure, n, ties)
+
+
+store = DataStore()
+
+
+def get_years() -> list[int]:
+    return store.partitions().years()
+
+
+def get_dimension(column: str) -> list:
+    return store.partitions().dimension(column)
+
+
+def get_rollup(name: str) -> pd.DataFrame:
+    return store.rollup(name)
+
+
+def get_cube(name: str) -> MeasureCube:
+    return store.cube(name)
+
+
+def get_ytd(name: str) -> YearToDate:
+    return store.ytd(name)
+
+
+def get_month_grid(name: str, year: int, measure: str) -> pd.DataFrame:
+    return store.month_grid(name, year, measure)
+
+
+def get_top(
+    name: str,
+    year: int,
+    month: int | None,
+    measure: str,
+    n: int,
+    ties: str | None = None,
+) -> pd.DataFrame:
+    return store.top(name, year, month, measure, n, ties)
+
+
+def get_month_measures(year: int, month: int) -> dict:
+    return store.cube("monthly").get(year, month)
+
+
+def get_year_measures(year: int) -> dict:
+    return store.cube("yearly").get(year)
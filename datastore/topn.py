@@ -0,0 +1,81 @@
+"""Partial top-N selection shared by the ranking widgets.
+
+``top_n`` picks the largest rows with ``np.argpartition`` and only sorts the
+ones it keeps, so ranking thousands of products for a top 3 costs a single
+linear pass. ``Rankings`` keeps recent selections per (rollup, year, month,
+measure); a widget asking for fewer rows than a cached selection is served
+from its tail.
+"""
+from __future__ import annotations
+
+import math
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+
+def top_n(frame: pd.DataFrame, measure: str, n: int, ties: str | None = None) -> pd.DataFrame:
+    """The ``n`` rows with the largest ``measure``, in ascending order.
+
+    ``ties`` names a column ordering rows with equal values.
+    """
+    values = frame[measure].to_numpy()
+    if n <= 0:
+        return frame.iloc[:0]
+    if n < len(values):
+        picked = np.argpartition(values, len(values) - n)[len(values) - n:]
+    else:
+        picked = np.arange(len(values))
+    if ties is None:
+        order = np.argsort(values[picked], kind="stable")
+    else:
+        order = np.lexsort((frame[ties].to_numpy()[picked], values[picked]))
+    return frame.iloc[picked[order]]
+
+
+class Rankings:
+    """LRU of top-N selections.
+
+    ``source(name, year, month)`` returns the frame to rank; ``month`` is None
+    when ranking a whole year.
+    """
+
+    def __init__(self, source: Callable[[str, int, int | None], pd.DataFrame], maxsize: int = 256):
+        self.source = source
+        self.maxsize = maxsize
+        self._selections = OrderedDict()
+        self._lock = threading.Lock()
+
+    def top(
+        self,
+        name: str,
+        year: int,
+        month: int | None,
+        measure: str,
+        n: int,
+        ties: str | None = None,
+    ) -> pd.DataFrame:
+        key = (name, year, month, measure, ties)
+        with self._lock:
+            cached = self._selections.get(key)
+            if cached is not None:
+                self._selections.move_to_end(key)
+        if cached is None or cached[0] < n:
+            frame = self.source(name, year, month)
+            selection = top_n(frame, measure, n, ties)
+            kept = math.inf if len(frame) <= n else n
+            cached = (kept, selection)
+            with self._lock:
+                self._selections[key] = cached
+                self._selections.move_to_end(key)
+                while len(self._selections) > self.maxsize:
+                    self._selections.popitem(last=False)
+        selection = cached[1]
+        return selection.iloc[len(selection) - min(n, len(selection)):]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._selections.clear()
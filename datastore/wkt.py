@@ -0,0 +1,31 @@
+"""Parsing of the ``store_location`` WKT column.
+
+Locations arrive as ``POINT (lon lat)`` strings. A store always reports the
+same point, so the column has only as many distinct values as there are stores
+while it has one row per invoice line. The parser factorizes the column, runs a
+single regex extraction over the distinct strings and broadcasts the parsed
+coordinates back with an integer take.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+POINT_PATTERN = r"^\s*POINT\s*\(\s*([-+0-9.eE]+)\s+([-+0-9.eE]+)\s*\)\s*$"
+
+
+def parse_points(locations: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+    """Return ``(lon, lat)`` float64 arrays for a series of WKT points.
+
+    Missing or malformed values become NaN rather than ``(0, 0)``.
+    """
+    codes, uniques = pd.factorize(locations)
+
+    parts = pd.Series(uniques, dtype=object).str.extract(POINT_PATTERN)
+    lon = pd.to_numeric(parts[0], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    lat = pd.to_numeric(parts[1], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+    # factorize marks missing values with -1; append a NaN slot for them.
+    lon = np.append(lon, np.nan)[codes]
+    lat = np.append(lat, np.nan)[codes]
+    return lon, lat
@@ -0,0 +1,63 @@
+"""Year-to-date totals from cumulative month sums.
+
+``YearToDate`` turns a year x month x dimension rollup into one array per
+year holding running totals along the month axis: row ``m`` is the sum of
+months 1 through ``m`` for every member of the dimension, row 0 is zeros.
+Any "through month N" or "months A to B" question is then a row lookup or
+a single subtraction instead of a filtered groupby.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+MONTHS = 12
+
+
+class YearToDate:
+    def __init__(self, rollup: pd.DataFrame, dimension: str):
+        self.dimension = dimension
+        self.measures = [
+            column for column in rollup.columns if column not in ("yyyy", "mm", dimension)
+        ]
+        self._rollup = rollup
+        self._years = {}
+
+    def _year(self, year: int) -> tuple[pd.Index, np.ndarray]:
+        if year not in self._years:
+            rows = self._rollup[self._rollup["yyyy"] == year]
+            codes, members = pd.factorize(rows[self.dimension], sort=True)
+            sums = np.zeros((MONTHS + 1, len(members), len(self.measures)), dtype=np.int64)
+            sums[rows["mm"].to_numpy(dtype=np.int64), codes] = rows[self.measures].to_numpy(dtype=np.int64)
+            self._years[year] = (pd.Index(members, name=self.dimension), sums.cumsum(axis=0))
+        return self._years[year]
+
+    def between(self, year: int, first: int, last: int) -> pd.DataFrame:
+        """Totals of months ``first`` through ``last`` for the members sold in them.
+
+        Months are clipped to 1-12, so ``last`` may run past December.
+        """
+        members, sums = self._year(year)
+        first = min(max(first, 1), MONTHS + 1)
+        last = min(max(last, first - 1), MONTHS)
+        totals = pd.DataFrame(sums[last] - sums[first - 1], index=members, columns=self.measures)
+        if "rows" in totals:
+            totals = totals[totals["rows"] > 0]
+        return totals.reset_index()
+
+    def through(self, year: int, month: int) -> pd.DataFrame:
+        return self.between(year, 1, month)
+
+    def months(self, year: int, measure: str) -> pd.DataFrame:
+        """``measure`` per member (rows) and month (columns 1-12)."""
+        members, sums = self._year(year)
+        values = np.diff(sums[:, :, self.measures.index(measure)], axis=0).T
+        return pd.DataFrame(values, index=members, columns=pd.RangeIndex(1, MONTHS + 1, name="mm"))
+
+    def total(self, year: int, month: int, members) -> dict:
+        """Year-to-date measures summed over ``members``."""
+        index, sums = self._year(year)
+        positions = index.get_indexer(list(members))
+        positions = positions[positions >= 0]
+        month = min(max(month, 0), MONTHS)
+        return dict(zip(self.measures, sums[month, positions].sum(axis=0).tolist()))
@@ -4,57 +4,41 @@ import dash
 
 dash.register_page(__name__, path='/', name='sales')
 
-import pathlib
-
 import dash_bootstrap_components as dbc
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from dash import Dash, Input, Output, callback, dcc, html
-from plotly.subplots import make_subplots
-
-PATH = pathlib.Path(__file__).parent
-DATA_PATH = PATH.joinpath("data").resolve()
-
-df = pd.read_csv(DATA_PATH.joinpath('liquor_iowa_2021.csv'))
-df = df.dropna()
-
-df["yyyy"] = pd.to_datetime(df["date"]).dt.year
-df["mm"] = pd.to_datetime(df["date"]).dt.month
-df["dd"] = pd.to_datetime(df["date"]).dt.day
-df["wk"] = pd.to_datetime(df["date"]).dt.isocalendar().week
-
-df["lon"] = df["store_location"].str.split(' ').str[1]
-df["lon"] = df["lon"].str.split('(').str[1]
-df["lon"].fillna(0,inplace=True)
-df["lat"] = df["store_location"].str.split(' ').str[2]
-df["lat"] = df["lat"].str.split(')').str[0]
-df["lat"].fillna(0,inplace=True)
-df["lat"] = df["lat"].astype(float)
-df["lon"] = df["lon"].astype(float)
-
-n_categories = len(df["category_name"].unique().tolist())
-n_stores = len(df["store_name"].unique().tolist())
-n_country = len(df["county"].unique().tolist())
-
-
-season_dict = {1: 'Winter',
-               2: 'Winter',
-               3: 'Spring', 
-               4: 'Spring',
-               5: 'Spring',
-               6: 'Summer',
-               7: 'Summer',
-               8: 'Summer',
-               9: 'Fall',
-               10: 'Fall',
-               11: 'Fall',
-               12: 'Winter'}
+from dash import ClientsideFunction, Dash, Input, Output, State, callback, clientside_callback, dcc, html
+
+from caching.memo import memo
+from caching.responses import responses
+from components import figures
+from components.cards import INDICATOR_UP, SALES_INDICATORS
+from datastore import (
+    get_cube,
+    get_dimension,
+    get_month_grid,
+    get_month_measures,
+    get_rollup,
+    get_top,
+    get_ytd,
+)
+from datastore.schema import MONEY_COLUMNS, SEASONS, to_dollars
+from datastore.store import TOTAL
 
-df['season'] = df['mm'].apply(lambda x: season_dict[x])
+HEADER_MEASURES = ["bottles_sold", "sale_dollars", "state_bottle_cost", "vendors", "items", "cities"]
 
 layout = dbc.Container(
     [
+        # Per-year data the browser switches months with; see the clientside
+        # callbacks below.
+        dcc.Store(id="year_rollup"),
+        dcc.Store(id="sold_chart_figure"),
+        dcc.Store(id="anual_county_figure"),
+        # Formatting the clientside callbacks draw with, so that it is only
+        # defined in components.
+        dcc.Store(
+            id="sales_style",
+            data={"indicator": SALES_INDICATORS, "highlight": figures.HIGHLIGHT, "muted": figures.MUTED},
+        ),
         # ======================= Title & Date Selection
         dbc.Row(
             [
@@ -80,10 +64,9 @@ layout = dbc.Container(
                                                 searchable=False,
                                                 multi=False,
                                                 placeholder="Select year",
-                                                options=[
-                                                    {"label": c, "value": c}
-                                                    for c in sorted(df["yyyy"].unique())
-                                                ],
+                                                # Filled from the partition manifest by
+                                                # the year_options callback in app.py.
+                                                options=[{"label": 2021, "value": 2021}],
                                                 value=2021,
                                             )
                                         ),
@@ -294,7 +277,7 @@ layout = dbc.Container(
             [
                 dbc.Col(
                     dbc.Card(
-                        dbc.CardBody(html.Div(id="sold_chart"))
+                        dbc.CardBody(html.Div(dcc.Graph(id="sold_chart_graph"), id="sold_chart"))
                     ),
                     xs=12,
                     sm=12,
@@ -329,9 +312,7 @@ layout = dbc.Container(
                                                 searchable=False,
                                                 multi=True,
                                                 placeholder="County",
-                                                options=df["county"]
-                                                .unique()
-                                                .tolist(),
+                                                options=["LINN", "POLK"],
                                                 value=["LINN", "POLK"],
                                             ),
                                             className="mb-5",
@@ -339,7 +320,7 @@ layout = dbc.Container(
                                         ),
                                     ]
                                 ),
-                                dbc.Row(html.Div(id="anual_county")),
+                                dbc.Row(html.Div(dcc.Graph(id="anual_county_graph"), id="anual_county")),
                             ]
                         )
                     ),
@@ -368,9 +349,7 @@ layout = dbc.Container(
                                         searchable=False,
                                         multi=True,
                                         placeholder="products",
-                                        options=df["item_description"]
-                                        .unique()
-                                        .tolist(),
+                                        options=["Titos Handmade Vodka"],
                                         value=["Titos Handmade Vodka"],
                                     ),
                                     className="product-drpn",
@@ -484,626 +463,204 @@ layout = dbc.Container(
 )
 
 
-# =========================== Header with 6 Cards ===============================
-# -------------------------- Callback card 1 ------------------------------------
-@callback(
-    Output(component_id="card1", component_property="children"),
-    Input(component_id="year", component_property="value"),
-    Input(component_id="month", component_property="value"),
-)
-def update_card1(year, month):
-    data3 = df[(df["yyyy"] == year) & (df["mm"] == month)]
-    data3 = data3["bottles_sold"].sum()
-
-    return html.P(f"{data3:,.0f}")
-
-
-#  ------------------------- Callback card 1 INDICATOR ----------------------------
+# =========================== Dropdown options ===============================
+# The layout is built without touching the data store so that importing this
+# page stays cheap; the options are filled in once the page is displayed.
 @callback(
-    Output(component_id="indicator1", component_property="children"),
-    [
-        Input(component_id="year", component_property="value"),
-        Input(component_id="month", component_property="value"),
-    ],
-)
-def update_card1(year, month):
-    data2 = df[(df["yyyy"] == year) & (df["mm"] == month - 1)]
-    data2 = data2["bottles_sold"].sum()
-
-    data3 = df[(df["yyyy"] == year) & (df["mm"] == month)]
-    data3 = data3["bottles_sold"].sum()
-
-    reference = (data3 - data2) / data2 * 100
-
-    reference_month = month - 1
-
-    if reference > 0:
-        return html.P(
-            f"+{reference:,.0f}%",
-            style={
-                "color": "rgb(102, 255, 204)",
-                "font-weight": "bold",
-            },
-            className="card-indicator",
-        )
-
-    return html.P(
-        f"{reference:,.0f}%",
-        style={
-            "color": "#EC1E3D",
-            "font-weight": "bold",
-        },
-        className="card-indicator",
-    )
-
-
-#  ------------------------- Callback card 2 ----------------------------
-@callback(
-    Output(component_id="card2", component_property="children"),
-    [
-        Input(component_id="year", component_property="value"),
-        Input(component_id="month", component_property="value"),
-    ],
-)
-def update_card1(year, month):
-    data2 = df[(df["yyyy"] == year) & (df["mm"] == month)]
-    sell = data2["sale_dollars"].sum()
-    cost = data2["state_bottle_cost"].sum()
-    revenue = sell - cost
-
-    return (html.P(f" ${revenue:,.0f}"),)
-
-
-#  ------------------------- Callback card 2 INDICATOR ----------------------------
-@callback(
-    Output(component_id="indicator2", component_property="children"),
-    [
-        Input(component_id="year", component_property="value"),
-        Input(component_id="month", component_property="value"),
-    ],
-)
-def update_card1(year, month):
-    data2 = df[(df["yyyy"] == year) & (df["mm"] == month - 1)]
-    data2 = data2["bottles_sold"].sum()
-
-    data3 = df[(df["yyyy"] == year) & (df["mm"] == month)]
-    data3 = data3["bottles_sold"].sum()
-
-    reference = (data3 - data2) / data2 * 100
-
-    reference_month = month - 1
-
-    if reference > 0:
-        return html.P(
-            f"+{reference:,.2f}%",
-            style={
-                "color": "rgb(102, 255, 204)",
-                "font-weight": "bold",
-            },
-            className="card-indicator",
-        )
-
-    return html.P(
-        f"{reference:,.0f}%",
-        style={
-            "color": "#EC1E3D",
-            "font-weight": "bold",
-        },
-        className="card-indicator",
-    )
-
-
-#  ------------------------- Callback card 3 ----------------------------
-@callback(
-    Output(component_id="card3", component_property="children"),
-    [
-        Input(component_id="year", component_property="value"),
-        Input(component_id="month", component_property="value"),
-    ],
+    Output(component_id="county", component_property="options"),
+    Output(component_id="product", component_property="options"),
+    Input(component_id="county", component_property="id"),
 )
-def update_card1(year, month):
-    data2 = df[(df["yyyy"] == year) & (df["mm"] == month)]
-    cost = data2["state_bottle_cost"].sum()
+def update_options(_):
+    return get_dimension("county"), get_dimension("item_description")
 
-    return (html.P(f" ${cost:,.0f}"),)
 
-
-#  ------------------------- Callback card 3 INDICATOR ----------------------------
+# =========================== Header with 6 Cards ===============================
+# The server sends a year's monthly cube cells once, as one list per measure
+# indexed by month (slot 0 is empty so January has nothing to compare with),
+# with the money measures already in dollars.
+# The six cards and their indicators are then redrawn in the browser when the
+# month changes, without a request; see assets/clientside.js.
 @callback(
-    Output(component_id="indicator3", component_property="children"),
-    [
-        Input(component_id="year", component_property="value"),
-        Input(component_id="month", component_property="value"),
-    ],
+    Output(component_id="year_rollup", component_property="data"),
+    Input(component_id="year", component_property="value"),
 )
-def update_card1(year, month):
-    data2 = df[(df["yyyy"] == year) & (df["mm"] == month - 1)]
-    data2 = data2["bottles_sold"].sum()
-
-    data3 = df[(df["yyyy"] == year) & (df["mm"] == month)]
-    data3 = data3["bottles_sold"].sum()
-
-    reference = (data3 - data2) / data2 * 100
-
-    reference_month = month - 1
-
-    if reference > 0:
-        return html.P(
-            f"+{reference:,.2f}%",
-            style={
-                "color": "rgb(102, 255, 204)",
-                "font-weight": "bold",
-            },
-            className="card-indicator",
-        )
-
-    return html.P(
-        f"{reference:,.0f}%",
-        style={
-            "color": "#EC1E3D",
-            "font-weight": "bold",
-        },
-        className="card-indicator",
-    )
-
-
-#  ------------------------- Callback card 4 ----------------------------
-@callback(
-    Output(component_id="card4", component_property="children"),
-    [
-        Input(component_id="year", component_property="value"),
-        Input(component_id="month", component_property="value"),
-    ],
+@memo.memoize
+def update_year_rollup(year):
+    cells = [get_month_measures(year, mm) for mm in range(13)]
+    rollup = {measure: [int(cell[measure]) for cell in cells] for measure in HEADER_MEASURES}
+    for measure in rollup.keys() & set(MONEY_COLUMNS):
+        rollup[measure] = [to_dollars(value) for value in rollup[measure]]
+    return rollup
+
+
+clientside_callback(
+    ClientsideFunction(namespace="sales", function_name="header"),
+    [Output(component_id=f"card{i}", component_property="children") for i in range(1, 7)]
+    + [Output(component_id=f"indicator{i}", component_property="children") for i in range(1, 7)],
+    Input(component_id="month", component_property="value"),
+    Input(component_id="year_rollup", component_property="data"),
+    State(component_id="sales_style", component_property="data"),
 )
-def update_card1(year, month):
-    data2 = df[(df["yyyy"] == year) & (df["mm"] == month)]
-    data2 = len(data2["vendor_number"].unique().tolist())
 
-    return (html.P(f"{data2:,.0f}"),)
 
+# ----------------------------------- Header with 6 Cards ---------------------------
+# ----------------------------------- Graph I ---------------------------------------
+# The server builds the year's figure; the selected month is highlighted in
+# the browser.
+responses.register("sold_chart_figure.data")
 
-#  ------------------------- Callback card 4 INDICATOR ----------------------------
 @callback(
-    Output(component_id="indicator4", component_property="children"),
-    [
-        Input(component_id="year", component_property="value"),
-        Input(component_id="month", component_property="value"),
-    ],
+    Output(component_id="sold_chart_figure", component_property="data"),
+    Input(component_id="year", component_property="value"),
 )
-def update_card1(year, month):
-    data2 = df[(df["yyyy"] == year) & (df["mm"] == month - 1)]
-    data2 = data2["bottles_sold"].sum()
-
-    data3 = df[(df["yyyy"] == year) & (df["mm"] == month)]
-    data3 = data3["bottles_sold"].sum()
-
-    reference = (data3 - data2) / data2 * 100
-
-    reference_month = month - 1
-
-    if reference > 0:
-        return html.P(
-            f"+{reference:,.2f}%",
-            style={
-                "color": "rgb(102, 255, 204)",
-                "font-weight": "bold",
-            },
-            className="card-indicator",
-        )
+@memo.memoize
+def update_graph(year):
 
-    return html.P(
-        f"{reference:,.0f}%",
-        style={
-            "color": "#EC1E3D",
-            "font-weight": "bold",
+    data2 = get_rollup("monthly")
+    data2 = data2[(data2["yyyy"] == year) & (data2["mm"] <= 12)]
+    data2 = data2.assign(sale_dollars=to_dollars(data2["sale_dollars"]))
+
+    months = data2["mm"].tolist()
+    fig = figures.figure(
+        figures.SOLD_CHART,
+        {
+            "type": "bar",
+            "x": months,
+            "y": data2["bottles_sold"].tolist(),
+            "name": "Total Bottles Sold",
+            "text": data2["bottles_sold"].tolist(),
+            "textposition": "outside",
+            "texttemplate": "%{text:.2s}",
+            "marker": {"color": figures.MUTED},
+            "xaxis": "x",
+            "yaxis": "y",
         },
-        className="card-indicator",
-    )
-
-
-#  ------------------------- Callback card 5 ----------------------------
-@callback(
-    Output(component_id="card5", component_property="children"),
-    [
-        Input(component_id="year", component_property="value"),
-        Input(component_id="month", component_property="value"),
-    ],
-)
-def update_card1(year, month):
-    data2 = df[(df["yyyy"] == year) & (df["mm"] == month)]
-    data2 = len(data2["item_description"].unique().tolist())
-
-    return (html.P(f"{data2:,.0f}"),)
-
-
-#  ------------------------- Callback card 5 INDICATOR ----------------------------
-@callback(
-    Output(component_id="indicator5", component_property="children"),
-    [
-        Input(component_id="year", component_property="value"),
-        Input(component_id="month", component_property="value"),
-    ],
-)
-def update_card1(year, month):
-    data2 = df[(df["yyyy"] == year) & (df["mm"] == month - 1)]
-    data2 = data2["bottles_sold"].sum()
-
-    data3 = df[(df["yyyy"] == year) & (df["mm"] == month)]
-    data3 = data3["bottles_sold"].sum()
-
-    reference = (data3 - data2) / data2 * 100
-
-    reference_month = month - 1
-
-    if reference > 0:
-        return html.P(
-            f"+{reference:,.2f}%",
-            style={
-                "color": "rgb(102, 255, 204)",
-                "font-weight": "bold",
-            },
-            className="card-indicator",
-        )
-
-    return html.P(
-        f"{reference:,.0f}%",
-        style={
-            "color": "#EC1E3D",
-            "font-weight": "bold",
+        {
+            "type": "scatter",
+            "x": months,
+            "y": data2["sale_dollars"].tolist(),
+            "name": "Total Sales in $",
+            "marker": {"size": 12, "line": {"width": 2, "color": "rgb(102, 255, 204)"}, "color": figures.BAR_COLOR},
+            "line": {"width": 2, "color": "rgb(102, 255, 204)"},
+            "text": data2["sale_dollars"].tolist(),
+            "textposition": "top right",
+            "textfont": {"color": "rgb(102, 255, 204)"},
+            "mode": "lines+markers+text",
+            "texttemplate": "%{text:.2s}",
+            "xaxis": "x",
+            "yaxis": "y2",
         },
-        className="card-indicator",
     )
 
+    return fig
 
-#  ------------------------- Callback card 6 ----------------------------
-@callback(
-    Output(component_id="card6", component_property="children"),
-    [
-        Input(component_id="year", component_property="value"),
-        Input(component_id="month", component_property="value"),
-    ],
-)
-def update_card1(year, month):
-    data2 = df[(df["yyyy"] == year) & (df["mm"] == month)]
-    data2 = len(data2["city"].unique().tolist())
-
-    return (html.P(f"{data2:,.0f}"),)
-
-
-#  ------------------------- Callback card 6 INDICATOR ----------------------------
-@callback(
-    Output(component_id="indicator6", component_property="children"),
-    [
-        Input(component_id="year", component_property="value"),
-        Input(component_id="month", component_property="value"),
-    ],
-)
-def update_card1(year, month):
-    data2 = df[(df["yyyy"] == year) & (df["mm"] == month - 1)]
-    data2 = data2["bottles_sold"].sum()
-
-    data3 = df[(df["yyyy"] == year) & (df["mm"] == month)]
-    data3 = data3["bottles_sold"].sum()
-
-    reference = (data3 - data2) / data2 * 100
-
-    reference_month = month - 1
-
-    if reference > 0:
-        return html.P(
-            f"+{reference:,.2f}%",
-            style={
-                "color": "rgb(102, 255, 204)",
-                "font-weight": "bold",
-            },
-            className="card-indicator",
-        )
 
-    return html.P(
-        f"{reference:,.0f}%",
-        style={
-            "color": "#EC1E3D",
-            "font-weight": "bold",
-        },
-        className="card-indicator",
-    )
-
-# ----------------------------------- Header with 6 Cards ---------------------------
-# ----------------------------------- Graph I ---------------------------------------
-@callback(
-    Output(component_id="sold_chart", component_property="children"),
-    Input(component_id="year", component_property="value"),
+clientside_callback(
+    ClientsideFunction(namespace="sales", function_name="highlight"),
+    Output(component_id="sold_chart_graph", component_property="figure"),
     Input(component_id="month", component_property="value"),
+    Input(component_id="sold_chart_figure", component_property="data"),
+    State(component_id="sales_style", component_property="data"),
 )
-def update_graph(year, month):
-
-    data2 = (
-        df.groupby(["yyyy", "mm"])["bottles_sold", "sale_dollars"].sum().reset_index()
-    )
-    data2 = data2[(data2["yyyy"] == year) & (data2["mm"] <= 12)]
-
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-
-    fig.add_trace(
-        go.Bar(
-            x=data2["mm"],
-            y=data2["bottles_sold"],
-            name="Total Bottles Sold",
-            text=data2["bottles_sold"],
-            textposition="outside",
-            texttemplate="%{text:.2s}",
-        ),
-        secondary_y=False,
-    )
-
-    fig.add_trace(
-        go.Scatter(
-            x=data2["mm"],
-            y=data2["sale_dollars"],
-            name="Total Sales in $",
-            marker=dict(size=12, line=dict(width=2, color="rgb(102, 255, 204)")),
-            line=dict(width=2, color="rgb(102, 255, 204)"),
-            text=data2["sale_dollars"],
-            textposition="top right",
-            textfont=dict(color="rgb(102, 255, 204)"),
-            mode="lines+markers+text",
-            texttemplate="%{text:.2s}",
-        ),
-        secondary_y=True,
-    )
-
-    fig.update_traces(marker_color="rgb(33, 60, 99)")
-
-    fig.update_layout(
-        height=315,
-        margin=dict(l=20, r=30, t=30, b=30),
-        plot_bgcolor="rgb(0,0,0,0)",
-        legend_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgb(0,0,0,0)",
-        font_color="#909090",
-        hovermode="closest",
-        xaxis_title="Months",
-        yaxis_title="Total of Bottles Sold",
-        legend=dict(yanchor="top", y=1.4, xanchor="left", x=0),
-        title={
-            "text": "Bottles Sold vs Revenue",
-            "y": 0.9,
-            "x": 0.5,
-            "xanchor": "center",
-            "yanchor": "top",
-        },
-    )
-
-    fig["data"][0]["marker"]["color"] = ["#E74C3C" if c == month else "#2C3E50" for c in fig["data"][0]["x"]]
-    
-    return html.Div(dcc.Graph(figure=fig), id="sold_chart")
 
 
 #  ---------------------------- Graph II -------------------------------------
+responses.register("top_county.children")
+
 @callback(
     Output(component_id="top_county", component_property="children"),
     Input(component_id="year", component_property="value"),
     Input(component_id="month", component_property="value"),
 )
+@memo.memoize
 def update_graph(year, month):
 
-    data2 = df[(df["yyyy"] == year) & (df["mm"] <= (month + 1))]
-    data2 = data2.groupby(["county"])["bottles_sold"].sum().reset_index()
-    data_new = data2.sort_values(by=["bottles_sold"], ascending=True).iloc[-5:]
-
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-
-    fig.add_trace(
-        go.Bar(
-            x=data_new["bottles_sold"],
-            y=data_new["county"],
-            name="yaxis data",
-            orientation="h",
-        ),
-        secondary_y=False,
-    )
-
-    fig.update_traces(
-        marker_color="rgb(33, 60, 99)",
-    )
-
-    fig.update_layout(
-        height=315,
-        margin=dict(l=20, r=30, t=50, b=30),
-        plot_bgcolor="rgb(0,0,0,0)",
-        legend_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgb(0,0,0,0)",
-        font_color="#909090",
-        hovermode="closest",
-        title={
-            "text": "Top 5 Counties",
-            "y": 0.95,
-            "x": 0.5,
-            "xanchor": "center",
-            "yanchor": "top",
+    data_new = get_top("county_monthly", year, month + 1, "bottles_sold", 5)
+
+    fig = figures.figure(
+        figures.TOP_COUNTY,
+        {
+            "type": "bar",
+            "x": data_new["bottles_sold"].tolist(),
+            "y": data_new["county"].tolist(),
+            "name": "yaxis data",
+            "orientation": "h",
+            "marker": {"color": figures.BAR_COLOR},
         },
     )
 
-    fig.for_each_trace(
-        lambda trace: trace.update(marker_color="#9D3469") if trace == month else (),
-    )
-
     return html.Div(dcc.Graph(figure=fig), id="top_county")
 
 
 # =========================== Bar Chart Vendor
 # ----------------------------------- Graph I ---------------------------------------
+responses.register("anual_county_figure.data")
+
 @callback(
-    Output(component_id="anual_county", component_property="children"),
+    Output(component_id="anual_county_figure", component_property="data"),
     [
         Input(component_id="year", component_property="value"),
-        Input(component_id="month", component_property="value"),
         Input(component_id="county", component_property="value"),
     ],
 )
-def update_graph(year, month, county):
-
-    data2 = (
-        df.groupby(
-            [
-                "yyyy",
-                "mm",
-                "county",
-            ]
-        )["bottles_sold"]
-        .sum()
-        .reset_index()
-    )
-
-    data2 = data2[(data2["yyyy"] == year) & (data2["mm"] <= 12)]
-    data2 = data2[data2["county"].isin(county)]
-
-    data3 = df.groupby(["yyyy", "mm"])["bottles_sold"].sum().reset_index()
-    data3 = data3[(data3["yyyy"] == year) & (data3["mm"] <= 12)]
-
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-
-    fig.add_trace(
-        go.Bar(
-            x=data2["mm"],
-            y=data2["bottles_sold"],
-            name="Total Bottles Sold",
-            text=data2["bottles_sold"],
-            textposition="outside",
-            texttemplate="%{text:.2s}",
-        ),
-        secondary_y=False,
-    )
-
-    fig.add_trace(
-        go.Scatter(
-            x=data3["mm"],
-            y=data3["bottles_sold"],
-            name="total Sales in $",
-            marker=dict(
-                size=12,
-                line=dict(
-                    width=2,
-                    color="#FFA500",
-                ),
-            ),
-            line=dict(width=2, color="#FFA500"),
-            text=data3["bottles_sold"],
-            textposition="top right",
-            textfont=dict(color="#E58606"),
-            mode="lines+markers+text",
-            texttemplate="%{text:.2s}",
-        ),
-        secondary_y=False,
-    )
-
-    fig.update_traces(
-        marker_color="rgb(33, 60, 99)",
-    )
-
-    fig.update_layout(
-        height=315,
-        margin=dict(l=20, r=30, t=50, b=30),
-        plot_bgcolor="rgb(0,0,0,0)",
-        legend_bgcolor="rgba(0,0,0,0)",
-        paper_bgcolor="rgb(0,0,0,0)",
-        font_color="#909090",
-        hovermode="closest",
-        xaxis_title="Months",
-        yaxis_title="Total of Bottles Sold by County",
-        legend=dict(yanchor="top", y=1.4, xanchor="left", x=0),
-        title={
-            "text": "Total of Bottles Sold by County",
-            "y": 0.98,
-            "x": 0.5,
-            "xanchor": "center",
-            "yanchor": "top",
+@memo.memoize
+def update_graph(year, county):
+
+    grid = get_month_grid("county_monthly", year, "bottles_sold")
+    counties = grid.index[:-1].intersection(county or [])
+
+    data2 = grid.loc[counties].stack().rename("bottles_sold").reset_index()
+    data2 = data2[data2["bottles_sold"] > 0]
+
+    data3 = grid.loc[TOTAL].rename("bottles_sold").reset_index()
+    data3 = data3[data3["bottles_sold"] > 0]
+
+    months = data2["mm"].tolist()
+    fig = figures.figure(
+        figures.ANUAL_COUNTY,
+        {
+            "type": "bar",
+            "x": months,
+            "y": data2["bottles_sold"].tolist(),
+            "name": "Total Bottles Sold",
+            "text": data2["bottles_sold"].tolist(),
+            "textposition": "outside",
+            "texttemplate": "%{text:.2s}",
+            "marker": {"color": figures.MUTED},
+        },
+        {
+            "type": "scatter",
+            "x": data3["mm"].tolist(),
+            "y": data3["bottles_sold"].tolist(),
+            "name": "total Sales in $",
+            "marker": {"size": 12, "line": {"width": 2, "color": "#FFA500"}, "color": figures.BAR_COLOR},
+            "line": {"width": 2, "color": "#FFA500"},
+            "text": data3["bottles_sold"].tolist(),
+            "textposition": "top right",
+            "textfont": {"color": "#E58606"},
+            "mode": "lines+markers+text",
+            "texttemplate": "%{text:.2s}",
         },
     )
 
-    fig["data"][0]["marker"]["color"] = ["#E74C3C" if c == month else "#2C3E50" for c in fig["data"][0]["x"]]
-
-    return html.Div(dcc.Graph(figure=fig), id="anual_county")
+    return fig
 
 
-# ----------------------------------- Card 1 ---------------------------------------
-@callback(
-    Output(component_id="month_orders", component_property="children"),
-    [
-        Input(component_id="year", component_property="value"),
-        Input(component_id="month", component_property="value"),
-        Input(component_id="product", component_property="value"),
-    ],
+clientside_callback(
+    ClientsideFunction(namespace="sales", function_name="highlight"),
+    Output(component_id="anual_county_graph", component_property="figure"),
+    Input(component_id="month", component_property="value"),
+    Input(component_id="anual_county_figure", component_property="data"),
+    State(component_id="sales_style", component_property="data"),
 )
-def update_graph(year, month, product):
-
-    data2 = (
-        df.groupby(["yyyy", "mm", "item_description"])["invoice_and_item_number"]
-        .count()
-        .reset_index()
-    )
-    data2 = data2[(data2["yyyy"] == year) & (data2["mm"] == month)]
-    data2 = data2[data2["item_description"].isin(product)]
-    month_orders = data2["invoice_and_item_number"].sum()
-
-    return html.P(f"{month_orders:,.0f}")
 
 
-# ------
+# ----------------------------------- Product Cards ---------------------------------------
 @callback(
+    Output(component_id="month_orders", component_property="children"),
     Output(component_id="orders", component_property="children"),
-    [
-        Input(component_id="year", component_property="value"),
-        Input(component_id="month", component_property="value"),
-        Input(component_id="product", component_property="value"),
-    ],
-)
-def update_graph(year, month, product):
-
-    data2 = (
-        df.groupby(["yyyy", "mm", "item_description"])["invoice_and_item_number"]
-        .count()
-        .reset_index()
-    )
-    data2 = data2[(data2["yyyy"] == year) & (data2["mm"] <= (month))]
-    data2 = data2[data2["item_description"].isin(product)]
-    orders = data2["invoice_and_item_number"].sum()
-
-    return html.P(
-        f"{orders:,.0f} orders",
-        style={
-            "color": "rgb(102, 255, 204)",
-            "font-weight": "bold",
-        },
-        className="card-indicator",
-    )
-
-
-# ----------------------------------- Card 2 ---------------------------------------
-@callback(
     Output(component_id="month_stores", component_property="children"),
-    [
-        Input(component_id="year", component_property="value"),
-        Input(component_id="month", component_property="value"),
-        Input(component_id="product", component_property="value"),
-    ],
-)
-def update_graph(year, month, product):
-
-    data2 = (
-        df.groupby(["yyyy", "mm", "item_description"])["store_name"]
-        .count()
-        .reset_index()
-    )
-    data2 = data2[(data2["yyyy"] == year) & (data2["mm"] == month)]
-    data2 = data2[data2["item_description"].isin(product)]
-    month_stores = data2["store_name"].sum()
-
-    return html.P(f"{month_stores:,.0f}")
-
-
-# ---------
-@callback(
     Output(component_id="stores", component_property="children"),
     [
         Input(component_id="year", component_property="value"),
@@ -1111,24 +668,26 @@ def update_graph(year, month, product):
         Input(component_id="product", component_property="value"),
     ],
 )
-def update_graph(year, month, product):
-
-    data2 = (
-        df.groupby(["yyyy", "mm", "item_description"])["store_name"]
-        .count()
-        .reset_index()
-    )
-    data2 = data2[(data2["yyyy"] == year) & (data2["mm"] <= month)]
-    data2 = data2[data2["item_description"].isin(product)]
-    stores = data2["store_name"].sum()
-
-    return html.P(
-        f"{stores:,.0f} stores",
-        style={
-            "color": "rgb(102, 255, 204)",
-            "font-weight": "bold",
-        },
-        className="card-indicator",
+@memo.memoize
+def update_product_cards(year, month, product):
+    products = product or []
+
+    data2 = get_cube("product_monthly").total((year, month, p) for p in products)
+    data3 = get_ytd("product_monthly").total(year, month, products)
+
+    return (
+        html.P(f"{data2['rows']:,.0f}"),
+        html.P(
+            f"{data3['rows']:,.0f} orders",
+            style=INDICATOR_UP,
+            className="card-indicator",
+        ),
+        html.P(f"{data2['stores']:,.0f}"),
+        html.P(
+            f"{data3['stores']:,.0f} stores",
+            style=INDICATOR_UP,
+            className="card-indicator",
+        ),
     )
 
 
@@ -1139,27 +698,15 @@ def update_graph(year, month, product):
         Input(component_id="year", component_property="value"),
     ],
 )
+@memo.memoize
 def update_graph(year):
-    data2 = df[(df["yyyy"] == year)]
-    data2 = data2.groupby(["item_description"])["sale_dollars"].sum().reset_index()
-    product1 = data2.sort_values(by=["sale_dollars"], ascending=True).iloc[-1:]
-    product1_name = product1.values.tolist()[0][0]
-    product1_value = product1.values.tolist()[0][1]
-    
-
-    product2 = data2.sort_values(by=["sale_dollars"], ascending=True).iloc[-2:]
-    product2_name = product2.values.tolist()[0][0]
-    product2_value = product2.values.tolist()[0][1]
-
-    product3 = data2.sort_values(by=["sale_dollars"], ascending=True).iloc[-3:]
-    product3_name = product3.values.tolist()[0][0]
-    product3_value = product3.values.tolist()[0][1]
+    data2 = get_top("product_monthly", year, 12, "sale_dollars", 3).iloc[::-1]
+    data2 = data2.assign(sale_dollars=to_dollars(data2["sale_dollars"]))
 
     return html.Div(
         [
-            dbc.Row(html.P(f"{product1_name} (${product1_value:,.0f})")),
-            dbc.Row(html.P(f"{product2_name} (${product2_value:,.0f})")),
-            dbc.Row(html.P(f"{product3_name} (${product3_value:,.0f})")),
+            dbc.Row(html.P(f"{name} (${value:,.0f})"))
+            for name, value in zip(data2["item_description"], data2["sale_dollars"])
         ], className="high_products"
         )
 
@@ -1173,19 +720,15 @@ def update_graph(year):
         Input(component_id="month", component_property="value"),
     ],
 )
+@memo.memoize
 def update_graph(year, month):
-    data2 = df[(df["yyyy"] == year) & (df["mm"] <= month)]
+    total = get_cube("monthly").total((year, mm) for mm in range(1, month + 1))
+    total = to_dollars(total["sale_dollars"])
 
-    data2 = (
-        data2.groupby(["item_description"])[["sale_dollars", "bottles_sold"]]
-        .sum()
-        .reset_index()
-    )
-    data2["perc"] = (data2["sale_dollars"] / (data2["sale_dollars"].sum()) * 100).round(
-        2
-    )
-    data2.sort_values(by=["sale_dollars"], ascending=True)[-1:]
-    products = data2.sort_values(by=["sale_dollars"], ascending=True)[-8:]
+    products = get_top("product_monthly", year, month, "sale_dollars", 8)
+    products = products[["item_description", "sale_dollars", "bottles_sold"]]
+    products = products.assign(sale_dollars=to_dollars(products["sale_dollars"]))
+    products["perc"] = (products["sale_dollars"] / total * 100).round(2)
 
     return html.Div(
         dbc.Table.from_dataframe(products, striped=True, bordered=False, hover=True)
@@ -1193,6 +736,8 @@ def update_graph(year, month):
 
 
 #  ---------------------------- Pie Chart I -------------------------------------
+responses.register("product_season.figure")
+
 @callback(
     Output(component_id="product_season", component_property="figure"),
     Input(component_id="year", component_property="value"),
@@ -1200,15 +745,29 @@ def update_graph(year, month):
     Input(component_id="my_opinon", component_property="value"),
     
 )
+@memo.memoize
 def update_graph(year, product, radio):
-    data2 = df[(df["yyyy"] == 2021)]
-    data2 = data2[(data2["item_description"].isin(product))]
-
-    fig = px.pie(data2, values=radio, names='season', hole=.3, color_discrete_sequence=px.colors.sequential.RdBu,
-                 title="% consumption per season")
-    fig.update_traces(textposition='inside', textinfo='percent+label')
-    fig.update_layout(uniformtext_minsize=10, uniformtext_mode='hide', 
-                      annotations=[dict(text="Seasons",x=0.5, y=0.5, font_size=12, showarrow=False)])
-    
+    cube = get_cube("product_seasons")
+    seasons = [
+        (season, cube.total((year, p, season) for p in product or [])[radio])
+        for season in SEASONS.categories
+    ]
+    data2 = pd.DataFrame([s for s in seasons if s[1]], columns=["season", radio])
+    if radio in MONEY_COLUMNS:
+        data2 = data2.assign(**{radio: to_dollars(data2[radio])})
+
+    fig = figures.figure(
+        figures.PRODUCT_SEASON,
+        {
+            "type": "pie",
+            "labels": data2["season"].tolist(),
+            "values": data2[radio].tolist(),
+            "hole": 0.3,
+            "textposition": "inside",
+            "textinfo": "percent+label",
+            "hovertemplate": f"season=%{{label}}<br>{radio}=%{{value}}<extra></extra>",
+            "showlegend": True,
+        },
+    )
 
     return fig